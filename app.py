@@ -1,11 +1,17 @@
+from datetime import date, datetime
+
+import click
 from flask import Flask
 from logger.logger import Logger
+from metrics.metrics import init_metrics
 from schemas.schema import Schema
 from services.service import Service
 from models.model import BDModel
 from routes.route import FileGeneratorRoute
+from serializers.json_provider import BSONJSONProvider
 
 app = Flask(__name__)
+app.json = BSONJSONProvider(app)
 
 #CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000"}})
 
@@ -14,12 +20,16 @@ logger = Logger()
 # Schema
 schema = Schema()
 
-# Model
+# Model (the MongoClient is created lazily inside each gunicorn worker)
 db_conn = BDModel()
 db_conn.connect_to_database()
+init_metrics(app, db_conn)
 
 # Service
 service = Service(db_conn)
+db_conn.on_connect(service.asegurar_indices)
+# El primer cliente de cada proceso arranca su verificación de readiness
+db_conn.on_connect(service.readiness.start)
 
 # Routes
 routes = FileGeneratorRoute(service, schema)
@@ -27,6 +37,16 @@ routes = FileGeneratorRoute(service, schema)
 #Blueprint
 app.register_blueprint(routes)
 
+@app.cli.command("rebuild-rollups")
+@click.option("--desde", required=True, help="Fecha inicial YYYY-MM-DD")
+@click.option("--hasta", default=None, help="Fecha final YYYY-MM-DD (por defecto hoy)")
+def rebuild_rollups(desde, hasta):
+    """Recalcula los rollups semanales y mensuales desde los contadores diarios"""
+    start_date = datetime.strptime(desde, "%Y-%m-%d").date()
+    end_date = datetime.strptime(hasta, "%Y-%m-%d").date() if hasta else date.today()
+    written = service.reconstruir_rollups(start_date, end_date)
+    logger.info(f"Rollups reconstruidos: {written} documentos")
+
 if __name__ == "__main__":
     try:
         app.run(host="0.0.0.0", debug=False)
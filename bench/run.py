@@ -0,0 +1,311 @@
+"""Benchmark de las rutas de FileGeneratorRoute contra una base sembrada con bench.seed.
+
+Uso:
+    python -m bench.run [--requests 200] [--concurrency 4] [--output bench/results.json]
+                        [--baseline bench/baseline.json] [--save-baseline] [--tolerance 0.2]
+
+Importa app.py (requiere MONGODB_USER, MONGODB_PASS y MONGODB_HOST apuntando a
+la base sembrada) y ejecuta cada escenario con el cliente de pruebas de Flask,
+sin gunicorn ni red de por medio. Por escenario reporta latencia p50/p95/p99,
+throughput, comandos de Mongo por petición y el RSS máximo del proceso.
+
+Los escenarios de borrado consumen registros reales de la base (los últimos
+noFormato de cada colección) y el de ingesta inserta formularios nuevos, así
+que se ejecutan al final y la base debe volver a sembrarse entre corridas
+comparables.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pymongo import monitoring
+
+# Escenarios: (nombre, método, ruta, cuerpo JSON). Un cuerpo callable recibe el
+# número de petición y regresa el cuerpo de esa petición.
+SCENARIOS = [
+    ("form-counts", "GET", "/api2/v1/form-counts", None),
+    ("form-counts-exact", "GET", "/api2/v1/form-counts?exact=1", None),
+    ("weekly-registrations", "GET", "/api2/v1/weekly-registrations", None),
+    ("old-weekly-registrations", "GET", "/api2/v1/old-weekly-registrations", None),
+    ("weekly-stats", "GET", "/api2/v1/weekly-stats", None),
+    ("dashboard", "GET", "/api2/v1/dashboard", None),
+    ("dashboard-counts", "GET", "/api2/v1/dashboard?sections=form-counts", None),
+    ("vpnGet", "POST", "/api2/v1/vpnGet", {}),
+    ("vpnGet-page", "POST", "/api2/v1/vpnGet", {"limit": 100, "total": True}),
+    ("internetGet", "POST", "/api2/v1/internetGet", {}),
+    ("internetGet-page", "POST", "/api2/v1/internetGet", {"limit": 100}),
+    ("telefoniaGet", "POST", "/api2/v1/telefoniaGet", {}),
+    ("telefoniaGet-page", "POST", "/api2/v1/telefoniaGet", {"limit": 100}),
+    ("rfcGet", "POST", "/api2/v1/rfcGet", {}),
+    ("rfcGet-page", "POST", "/api2/v1/rfcGet", {"limit": 100}),
+    ("rfcFiltrado", "POST", "/api2/v1/rfcFiltrado", {}),
+    ("rfcFiltrado-ndjson", "POST", "/api2/v1/rfcFiltrado?stream=ndjson", {}),
+    ("telFiltrado", "POST", "/api2/v1/telFiltrado", {}),
+    ("vpnFiltrado", "POST", "/api2/v1/vpnFiltrado", {}),
+    ("interFiltrado", "POST", "/api2/v1/interFiltrado", {}),
+    ("exportar-csv", "GET", "/api2/v1/exportar/rfc?formato=csv", None),
+    ("exportar-csv-gzip", "GET", "/api2/v1/exportar/rfc?formato=csv&gzip=1", None),
+    ("exportar-xlsx", "GET", "/api2/v1/exportar/tel?formato=xlsx&origen=resumen", None),
+    ("registroErrores", "GET", "/api2/v1/registroErrores", None),
+    ("registroErrores-page", "GET", "/api2/v1/registroErrores?limit=100", None),
+    ("registroErrores-resumen", "GET", "/api2/v1/registroErrores?resumen=1", None),
+    ("search", "GET", "/api2/v1/search?q=jose", None),
+    ("search-accents", "GET", "/api2/v1/search?q=MARIA%20GARCIA&tipos=inter,tel", None),
+    ("cache-stats", "GET", "/api2/v1/cache-stats", None),
+    ("pool-stats", "GET", "/api2/v1/pool-stats", None),
+    ("healthcheck", "GET", "/api2/healthcheck", None),
+    ("ready", "GET", "/api2/ready", None),
+    ("metrics", "GET", "/api2/metrics", None),
+]
+
+# Escenarios de borrado: (nombre, ruta, colección de la que se toman los ids)
+DELETE_SCENARIOS = [
+    ("borrarRFC", "/api2/v1/borrarRFC", "rfc"),
+    ("borrarVPN", "/api2/v1/borrarVPN", "vpnMayo"),
+    ("borrarInter", "/api2/v1/borrarInter", "internet"),
+    ("borrarTel", "/api2/v1/borrarTel", "tel"),
+]
+BULK_DELETE_SIZE = 50
+
+# Formularios por petición del escenario de ingesta
+INGEST_SIZE = 50
+
+# Rutas sin escenario: el stream SSE no termina mientras el cliente está conectado
+UNBENCHED_ROUTES = {"/api2/v1/events"}
+
+# Métricas comparadas contra la línea base: mayor es peor salvo throughput
+COMPARED_METRICS = ("p50_ms", "p95_ms", "p99_ms", "throughput_rps", "mongo_ops_per_request")
+
+class CommandCounter(monitoring.CommandListener):
+    """Cuenta los comandos que la API envía a Mongo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def started(self, event):
+        with self._lock:
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+class RSSSampler:
+    """Muestrea el RSS actual del proceso para obtener el máximo de cada escenario"""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = 0
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._stop = threading.Event()
+        self._thread = None
+
+    def current(self):
+        try:
+            with open("/proc/self/statm") as statm:
+                return int(statm.read().split()[1]) * self._page_size
+        except OSError:
+            # Sin /proc solo hay máximo histórico (KB en Linux, bytes en macOS)
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if sys.platform == "darwin" else peak * 1024
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.current())
+
+    def __enter__(self):
+        self.peak = self.current()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current())
+
+def percentile(values, fraction):
+    """Percentil por rango más cercano de una lista ordenada"""
+    if not values:
+        return None
+    index = max(int(round(fraction * len(values) + 0.5)) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+def ingest_body(run_id, number):
+    """Lote de formularios válidos para el Schema con noFormato únicos por
+    corrida, petición y posición: %y%m%d + corrida + petición + posición"""
+    prefix = time.strftime("%y%m%d") + run_id
+    return [
+        {
+            "id": f"{prefix}{number:05d}{index:03d}",
+            "nombre": "Bench", "puesto": "Analista", "ua": "UA", "extension": "1234",
+            "correo": "bench@example.com", "marca": "Marca", "modelo": "Modelo", "serie": "S1",
+            "macadress": "00:00:00:00:00:00", "jefe": "Jefe", "puestojefe": "Director",
+            "servicios": "Internet", "justificacion": "Benchmark", "movimiento": "ALTA",
+            "malware": "SI", "vigencia": "SI", "so": "SI", "licencia": "SI",
+        }
+        for index in range(INGEST_SIZE)
+    ]
+
+def run_scenario(client, counter, method, path, body, requests, concurrency):
+    def send(number):
+        payload = body(number) if callable(body) else body
+        started = time.perf_counter()
+        response = client.open(path, method=method, json=payload)
+        # Consumir el cuerpo completo incluye el tiempo de las respuestas en streaming
+        response.get_data()
+        return time.perf_counter() - started, response.status_code
+
+    commands_before = counter.count
+    with RSSSampler() as rss, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        started = time.perf_counter()
+        results = list(pool.map(send, range(requests)))
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency * 1000 for latency, _ in results)
+    statuses = {}
+    for _, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        "method": method,
+        "path": path,
+        "requests": requests,
+        "status": statuses,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else None,
+        "mongo_ops_per_request": round((counter.count - commands_before) / requests, 2),
+        "peak_rss_mb": round(rss.peak / (1024 * 1024), 1),
+    }
+
+def compare(results, baseline, tolerance):
+    """Regresa las regresiones mayores a tolerance respecto a la línea base"""
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change < -tolerance if metric == "throughput_rps" else change > tolerance
+            if worse:
+                regressions.append(f"{name}.{metric}: {old} -> {new} ({change:+.0%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="peticiones por escenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="peticiones simultáneas")
+    parser.add_argument("--warmup", type=int, default=5, help="peticiones de calentamiento por escenario")
+    parser.add_argument("--only", default=None, help="ejecuta solo los escenarios que contienen este texto")
+    parser.add_argument("--skip-deletes", action="store_true", help="omite los escenarios que escriben (borrados e ingesta)")
+    parser.add_argument("--output", default="bench/results.json")
+    parser.add_argument("--baseline", default="bench/baseline.json")
+    parser.add_argument("--save-baseline", action="store_true", help="guarda los resultados como línea base")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="cambio relativo tolerado (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    # El listener debe registrarse antes de que el proceso cree su MongoClient
+    from app import app, db_conn
+    counter = CommandCounter()
+    db_conn.add_event_listener(counter)
+    client = app.test_client()
+
+    scenarios = [scenario for scenario in SCENARIOS if not args.only or args.only in scenario[0]]
+    if not args.skip_deletes:
+        for name, path, collection in DELETE_SCENARIOS:
+            if args.only and args.only not in name:
+                continue
+            ids = [
+                record["_id"] for record in
+                db_conn.db[collection].find({}, {"_id": 1}).sort("_id", -1).limit(args.requests)
+            ]
+            scenarios.append((name, "POST", path, lambda number, ids=ids: {"id": ids[number % len(ids)]}))
+        if not args.only or args.only in "borrarMasivo":
+            ids = [
+                record["_id"] for record in
+                db_conn.db["rfc"].find({}, {"_id": 1}).sort("_id", 1).limit(args.requests * BULK_DELETE_SIZE)
+            ]
+            scenarios.append((
+                "borrarMasivo", "POST", "/api2/v1/borrarMasivo",
+                lambda number, ids=ids: {
+                    "ids": {"rfc": ids[number * BULK_DELETE_SIZE:(number + 1) * BULK_DELETE_SIZE] or ["000000"]}
+                }
+            ))
+
+        if not args.only or args.only in "ingesta":
+            run_id = f"{int(time.time()) % 100000:05d}"
+            scenarios.append((
+                "ingesta", "POST", "/api2/v1/ingesta/vpn",
+                lambda number, run_id=run_id: ingest_body(run_id, number)
+            ))
+
+    # Se compara por plantilla de ruta: /api2/v1/exportar/rfc cubre /api2/v1/exportar/<tipo>
+    adapter = app.url_map.bind("localhost")
+    covered = set(UNBENCHED_ROUTES)
+    for _, method, path, _ in scenarios:
+        rule, _ = adapter.match(path.split("?")[0], method=method, return_rule=True)
+        covered.add(rule.rule)
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint.startswith("file_generator.") and rule.rule not in covered:
+            print(f"Aviso: la ruta {rule.rule} no tiene escenario", file=sys.stderr)
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "scenarios": {},
+    }
+    for name, method, path, body in scenarios:
+        # El calentamiento de los borrados consumiría registros
+        if not callable(body):
+            for _ in range(args.warmup):
+                client.open(path, method=method, json=body).get_data()
+        stats = run_scenario(client, counter, method, path, body, args.requests, args.concurrency)
+        results["scenarios"][name] = stats
+        print(
+            f"{name:28} p50={stats['p50_ms']:>9}ms p95={stats['p95_ms']:>9}ms p99={stats['p99_ms']:>9}ms "
+            f"{stats['throughput_rps']:>8} rps {stats['mongo_ops_per_request']:>6} ops/req "
+            f"{stats['peak_rss_mb']:>7}MB {stats['status']}"
+        )
+
+    with open(args.output, "w") as output:
+        json.dump(results, output, indent=2)
+    print(f"Resultados en {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+        print(f"Línea base guardada en {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        if regressions:
+            print("Regresiones respecto a la línea base:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("Sin regresiones respecto a la línea base")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Siembra una base de MongoDB local con volúmenes realistas para los benchmarks.
+
+Uso:
+    python -m bench.seed --scale 100000 [--uri mongodb://localhost:27017] [--drop] [--create-user]
+
+--scale es el número de formularios por colección (10k, 100k o 1M). Se crean
+las colecciones de formularios, sus *Counters diarios (_id %y%m%d), las
+colecciones Prueba* de los endpoints *Filtrado y Errores. Los datos son
+deterministas para una misma semilla.
+"""
+import argparse
+import os
+import random
+import string
+from datetime import datetime, timedelta
+from pymongo import MongoClient
+
+# Colección de formularios -> (colección de contadores, colección Prueba*)
+FORMS = {
+    "vpnMayo": ("vpnMayoCounters", "PruebaVPN"),
+    "internet": ("internetCounters", "PruebaInter"),
+    "rfc": ("rfcCounters", "PruebaIP2"),
+    "tel": ("telCounters", "PruebaTel"),
+}
+
+NOMBRES = ["José", "María", "Juan", "Ana", "Luis", "Sofía", "Carlos", "Lucía", "Jesús", "Andrea"]
+APELLIDOS = ["Pérez", "García", "López", "Hernández", "Martínez", "González", "Rodríguez", "Núñez"]
+AREAS = ["Gerencia de Informática", "Subdirección Técnica", "Organismo de Cuenca", "Dirección Local"]
+MOVIMIENTOS = ["ALTA", "BAJA", "CAMBIO"]
+BATCH_SIZE = 10000
+
+def _nombre(rng):
+    return f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}"
+
+def _correo(rng, nombre):
+    usuario = nombre.split()[0].lower().translate(str.maketrans("áéíóúñ", "aeioun"))
+    return f"{usuario}.{rng.randint(1, 9999)}@conagua.gob.mx"
+
+def _texto(rng, length):
+    return "".join(rng.choice(string.ascii_lowercase + " ") for _ in range(length))
+
+def _form_document(rng, collection, no_formato, fecha):
+    nombre = _nombre(rng)
+    document = {
+        "_id": no_formato,
+        "nombreUsuario": nombre,
+        "correoUsuario": _correo(rng, nombre),
+        "nombreJefe": _nombre(rng),
+        "movimiento": rng.choice(MOVIMIENTOS),
+        "area": rng.choice(AREAS),
+        "justificacion": _texto(rng, 200),
+        "fecha": fecha,
+    }
+    if collection == "vpnMayo":
+        document.update({
+            "nombreEnlace": nombre,
+            "telefonoEnlace": str(rng.randint(5500000000, 5599999999)),
+            "nombreAutoriza": _nombre(rng),
+            "puestoAutoriza": "Gerente",
+        })
+    elif collection == "internet":
+        document["ipUsuario"] = f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+    elif collection == "rfc":
+        document.update({
+            "noticket": f"TK{rng.randint(100000, 999999)}",
+            "memo": f"MEMO-{rng.randint(1, 9999)}",
+            "descbreve": _texto(rng, 60),
+        })
+    return document
+
+def _insert(collection, documents):
+    if documents:
+        collection.insert_many(documents, ordered=False)
+
+def seed(db, scale, days, rng):
+    """Crea scale formularios por colección repartidos en los últimos days días"""
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    for form, (counters, prueba) in FORMS.items():
+        per_day = {}
+        batch, prueba_batch = [], []
+        for _ in range(scale):
+            fecha = today - timedelta(days=rng.randrange(days))
+            day_id = fecha.strftime("%y%m%d")
+            per_day[day_id] = per_day.get(day_id, 0) + 1
+            no_formato = f"{day_id}{per_day[day_id]:05d}"
+            document = _form_document(rng, form, no_formato, fecha)
+            batch.append(document)
+            prueba_batch.append({key: value for key, value in document.items() if key != "_id"} | {"noFormato": no_formato})
+            if len(batch) >= BATCH_SIZE:
+                _insert(db[form], batch)
+                _insert(db[prueba], prueba_batch)
+                batch, prueba_batch = [], []
+        _insert(db[form], batch)
+        _insert(db[prueba], prueba_batch)
+        _insert(db[counters], [{"_id": day_id, "seq": seq} for day_id, seq in per_day.items()])
+        print(f"{form}: {scale} formularios, {len(per_day)} contadores diarios")
+
+    errores = []
+    for _ in range(max(scale // 10, 1)):
+        errores.append({
+            "Base de datos": rng.choice(list(FORMS)),
+            "Mensaje": _texto(rng, 80),
+            "Fecha": today - timedelta(days=rng.randrange(days), seconds=rng.randrange(86400)),
+        })
+        if len(errores) >= BATCH_SIZE:
+            _insert(db["Errores"], errores)
+            errores = []
+    _insert(db["Errores"], errores)
+    print(f"Errores: {max(scale // 10, 1)} documentos")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=10000, help="formularios por colección (10000, 100000, 1000000)")
+    parser.add_argument("--days", type=int, default=365, help="días de historia")
+    parser.add_argument("--uri", default=os.environ.get("BENCH_MONGODB_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default="project")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--drop", action="store_true", help="borra la base antes de sembrar")
+    parser.add_argument(
+        "--create-user", action="store_true",
+        help="crea en admin el usuario MONGODB_USER/MONGODB_PASS que usa la API"
+    )
+    args = parser.parse_args()
+
+    client = MongoClient(args.uri)
+    if args.create_user:
+        user, password = os.environ["MONGODB_USER"], os.environ["MONGODB_PASS"]
+        if not client.admin.command("usersInfo", user)["users"]:
+            client.admin.command("createUser", user, pwd=password, roles=["root"])
+            print(f"Usuario {user} creado")
+    if args.drop:
+        client.drop_database(args.db)
+    seed(client[args.db], args.scale, args.days, random.Random(args.seed))
+    client.close()
+
+if __name__ == "__main__":
+    main()
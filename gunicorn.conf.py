@@ -0,0 +1,44 @@
+import itertools
+import os
+import shutil
+import sys
+
+# Hilos por worker: las conexiones SSE de /api2/v1/events ocupan un hilo
+# mientras el cliente está conectado, no un worker completo
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", 16))
+
+def on_starting(server):
+    """Vacía el directorio de métricas compartido por los workers al arrancar"""
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+def child_exit(server, worker):
+    """Marca como muertas las métricas del worker que terminó"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+def pre_fork(server, worker):
+    """Asigna al worker nuevo el slot libre más bajo; un worker reiniciado
+    reutiliza el slot del que reemplaza y su archivo de log"""
+    used = {getattr(other, "log_slot", None) for other in server.WORKERS.values()}
+    worker.log_slot = next(slot for slot in itertools.count() if slot not in used)
+
+def post_fork(server, worker):
+    """Publica el slot del worker para el logger (dash_api.<slot>.log)"""
+    os.environ["LOG_WORKER_SLOT"] = str(worker.log_slot)
+    # Con preload_app el logger ya se configuró al hacer fork, sin slot
+    logger_module = sys.modules.get("logger.logger")
+    if logger_module is not None:
+        logger_module.reconfigure()
+
+def post_worker_init(worker):
+    """Arranca la verificación de readiness en cuanto el worker carga la app,
+    sin esperar a la primera petición a /api2/ready"""
+    app_module = sys.modules.get("app")
+    service = getattr(app_module, "service", None)
+    if service is not None:
+        service.readiness.start()
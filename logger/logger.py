@@ -1,35 +1,160 @@
+import atexit
+import json
 import logging as log
+import logging.handlers
 import os
+import queue
+import threading
+
+# Formato de texto original y su equivalente en JSON lines (LOG_FORMAT=json)
+TEXT_FORMAT = '%(asctime)s: %(levelname)s [%(filename)s:%(lineno)s] %(message)s'
+DATE_FORMAT = '%I:%M:%S %p'
+
+# Longitud máxima de un mensaje antes de truncarlo
+MAX_MESSAGE_LENGTH = int(os.environ.get("LOG_MAX_MESSAGE_LENGTH", 2000))
+
+_lock = threading.Lock()
+_listener = None
+_listener_pid = None
+_config = None
+
+class JsonFormatter(log.Formatter):
+    """Formats each record as one JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S%z"),
+            "level": record.levelname,
+            "pid": record.process,
+            "thread": record.threadName,
+            "file": f"{record.filename}:{record.lineno}",
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+def _file_handler(log_file):
+    """File sink with size (LOG_ROTATION=size) or time (LOG_ROTATION=time) rotation.
+
+    With LOG_PER_WORKER (default on) every gunicorn worker writes its own
+    file, so the workers never rotate the same file concurrently. The file
+    is named after the worker slot that gunicorn.conf.py assigns
+    (dash_api.0.log ... dash_api.<w-1>.log): a restarted worker reuses the
+    slot of the one it replaces, so the set of files stays bounded. Outside
+    gunicorn there is no slot and the plain log_file is used.
+    """
+    slot = os.environ.get("LOG_WORKER_SLOT")
+    if os.environ.get("LOG_PER_WORKER", "1") == "1" and slot is not None:
+        base, extension = os.path.splitext(log_file)
+        log_file = f"{base}.{slot}{extension}"
+
+    backup_count = int(os.environ.get("LOG_BACKUP_COUNT", 5))
+    rotation = os.environ.get("LOG_ROTATION", "size")
+    if rotation == "time":
+        return logging.handlers.TimedRotatingFileHandler(
+            log_file, when=os.environ.get("LOG_ROTATION_WHEN", "midnight"), backupCount=backup_count
+        )
+    if rotation == "size":
+        return logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=int(os.environ.get("LOG_MAX_BYTES", 10 * 1024 * 1024)), backupCount=backup_count
+        )
+    return log.FileHandler(log_file)
+
+def _configure(log_file, level):
+    """Route the root logger through a queue once per process.
+
+    Request threads only enqueue records; a QueueListener thread formats
+    them and does the console and file I/O. After a fork the listener
+    thread does not exist in the child, so it is started again there.
+    """
+    global _listener, _listener_pid, _config
+    with _lock:
+        if _listener is not None and _listener_pid == os.getpid():
+            return
+        _config = (log_file, level)
+
+        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        if os.environ.get("LOG_FORMAT", "text") == "json":
+            formatter = JsonFormatter()
+        else:
+            formatter = log.Formatter(TEXT_FORMAT, datefmt=DATE_FORMAT)
+
+        handlers = [log.StreamHandler(), _file_handler(log_file)]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        root = log.getLogger()
+        root.handlers = [logging.handlers.QueueHandler(log_queue)]
+        root.setLevel(level)
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        _listener_pid = os.getpid()
+        atexit.register(_listener.stop)
+
+def _restart_in_child():
+    """Start a new listener in a forked child that inherited a configured logger"""
+    global _listener, _lock
+    # The lock may have been held by another thread at fork time
+    _lock = threading.Lock()
+    if _config is not None:
+        _listener = None
+        _configure(*_config)
+
+os.register_at_fork(after_in_child=_restart_in_child)
+
+def reconfigure():
+    """Reopen the sinks of this process, e.g. after its worker slot changed"""
+    global _listener
+    with _lock:
+        if _listener is not None and _listener_pid == os.getpid():
+            _listener.stop()
+        _listener = None
+    if _config is not None:
+        _configure(*_config)
+
+def summarize(message):
+    """Reduce large payloads to a short description before they are formatted"""
+    if isinstance(message, (list, tuple, set)):
+        return f"<{type(message).__name__} con {len(message)} elementos>"
+    if isinstance(message, dict):
+        return f"<dict con {len(message)} llaves: {', '.join(map(str, list(message)[:5]))}>"
+    message = str(message)
+    if len(message) > MAX_MESSAGE_LENGTH:
+        return f"{message[:MAX_MESSAGE_LENGTH]}... ({len(message)} caracteres)"
+    return message
 
 class Logger:
 
     def __init__(self, log_file="/app/logs/dash_api.log", level=log.INFO):
-        os.makedirs(os.path.dirname(log_file), exist_ok=True)
-        
-        log.basicConfig(
-            level=level,
-            format='%(asctime)s: %(levelname)s [%(filename)s:%(lineno)s] %(message)s',
-            datefmt='%I:%M:%S %p',
-            handlers=[log.StreamHandler(), log.FileHandler(log_file)]
-        )
+        log_file = os.environ.get("LOG_FILE", log_file)
+        level = os.environ.get("LOG_LEVEL", level)
+        _configure(log_file, level)
         self.logger = log.getLogger()
-    
+
+    def _log(self, level, message):
+        # stacklevel=3 keeps the caller's file and line in the record
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, summarize(message), stacklevel=3)
+
     def debug(self, message):
         """Log a message with severity 'DEBUG' on the logger"""
-        self.logger.debug(message)
-    
+        self._log(log.DEBUG, message)
+
     def info(self, message):
         """Log a message with severity 'INFO' on the logger"""
-        self.logger.info(message)
-    
+        self._log(log.INFO, message)
+
     def warning(self, message):
         """Log a message with severity 'WARNING' on the logger"""
-        self.logger.warning(message)
-    
+        self._log(log.WARNING, message)
+
     def error(self, message):
         """Log a message with severity 'ERROR' on the logger"""
-        self.logger.error(message)
-    
+        self._log(log.ERROR, message)
+
     def critical(self, message):
         """Log a message with severity 'CRITICAL' on the logger"""
-        self.logger.critical(message)
\ No newline at end of file
+        self._log(log.CRITICAL, message)
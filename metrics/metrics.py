@@ -0,0 +1,135 @@
+import contextvars
+import os
+import time
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from pymongo import monitoring
+
+# Ruta de Flask que está atendiendo el hilo/contexto actual; las consultas
+# hechas fuera de una petición se atribuyen a "background"
+current_route = contextvars.ContextVar("current_route", default="background")
+
+REQUEST_LATENCY = Histogram(
+    "api_request_duration_seconds",
+    "Request latency by route, method and status code",
+    ["route", "method", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "api_requests_in_flight",
+    "Requests currently being served",
+    ["route"],
+    multiprocess_mode="livesum",
+)
+MONGO_COMMANDS = Counter(
+    "api_mongo_commands_total",
+    "MongoDB commands issued by route, command and outcome",
+    ["route", "command", "outcome"],
+)
+MONGO_COMMAND_DURATION = Histogram(
+    "api_mongo_command_duration_seconds",
+    "MongoDB command duration by route and command",
+    ["route", "command"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+class MongoMetricsListener(monitoring.CommandListener):
+    """Counts and times MongoDB commands, attributed to the current route"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event, "success")
+
+    def failed(self, event):
+        self._record(event, "failure")
+
+    def _record(self, event, outcome):
+        route = current_route.get()
+        MONGO_COMMANDS.labels(route, event.command_name, outcome).inc()
+        MONGO_COMMAND_DURATION.labels(route, event.command_name).observe(event.duration_micros / 1e6)
+
+def _before_request():
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    g.metrics_route = route
+    g.metrics_start = time.perf_counter()
+    g.metrics_token = current_route.set(route)
+    REQUESTS_IN_FLIGHT.labels(route).inc()
+
+class _StreamObserver:
+    """Wraps a streamed body so the request is measured until the body is
+    closed instead of when the view returns.
+
+    Flask runs teardown as soon as wsgi_app returns, before a streamed body
+    is iterated; the WSGI server always calls close() once the body is sent
+    or the client goes away.
+    """
+
+    def __init__(self, iterable, finish):
+        self._iterable = iterable
+        self._finish = finish
+
+    def __iter__(self):
+        return iter(self._iterable)
+
+    def close(self):
+        try:
+            close = getattr(self._iterable, "close", None)
+            if close:
+                close()
+        finally:
+            self._finish()
+
+def _finish_request(route, method, status, start, token):
+    REQUESTS_IN_FLIGHT.labels(route).dec()
+    REQUEST_LATENCY.labels(route, method, str(status)).observe(time.perf_counter() - start)
+    try:
+        current_route.reset(token)
+    except ValueError:
+        # Cerrado desde otro contexto: no hay nada que restaurar aquí
+        pass
+
+def _after_request(response):
+    g.metrics_status = response.status_code
+    if response.is_streamed and "metrics_route" in g:
+        # La ruta sigue activa mientras se genera el cuerpo, así los getMore
+        # del streaming se atribuyen a ella
+        args = (g.pop("metrics_route"), request.method, response.status_code, g.pop("metrics_start"), g.pop("metrics_token"))
+        response.response = _StreamObserver(response.response, lambda: _finish_request(*args))
+    return response
+
+def _teardown_request(exc):
+    # Las respuestas en streaming se terminan de medir en _StreamObserver.close
+    route = g.pop("metrics_route", None)
+    if route is None:
+        return
+    _finish_request(route, request.method, g.pop("metrics_status", 500), g.pop("metrics_start"), g.pop("metrics_token"))
+
+def init_metrics(app, db_conn):
+    """Registra los hooks de latencia por ruta y el listener de comandos de Mongo"""
+    db_conn.add_event_listener(MongoMetricsListener())
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+
+def render_metrics():
+    """Métricas en formato de texto de Prometheus.
+
+    Con PROMETHEUS_MULTIPROC_DIR (gunicorn) se agregan los archivos de todos
+    los workers; sin él se usa el registro del proceso.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
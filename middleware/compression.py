@@ -0,0 +1,136 @@
+import os
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli es opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard es opcional
+    zstandard = None
+
+# Respuestas más chicas que esto (bytes) no se comprimen
+MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+
+# Niveles moderados para acotar el CPU por petición
+GZIP_LEVEL = int(os.environ.get("COMPRESSION_GZIP_LEVEL", 5))
+BROTLI_QUALITY = int(os.environ.get("COMPRESSION_BROTLI_QUALITY", 4))
+ZSTD_LEVEL = int(os.environ.get("COMPRESSION_ZSTD_LEVEL", 3))
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+# Eventos SSE: bloques diminutos que los proxies deben entregar sin buffer
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+# Codificaciones disponibles en orden de preferencia del servidor
+ENCODINGS = [
+    encoding for encoding, available in (("zstd", zstandard), ("br", brotli), ("gzip", True))
+    if available
+]
+
+class _Gzip:
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+class _Brotli:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+class _Zstd:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._compressor.flush()
+
+COMPRESSORS = {"gzip": _Gzip, "br": _Brotli, "zstd": _Zstd}
+
+def etag_variants(etag):
+    """ETags con los que se pudo haber enviado etag según la codificación"""
+    return [etag] + [f"{etag}-{encoding}" for encoding in ENCODINGS]
+
+def negotiate():
+    """Elige la codificación con mayor calidad en Accept-Encoding; en empate
+    gana el orden de ENCODINGS. None si ninguna es aceptable."""
+    best, best_quality = None, 0
+    for encoding in ENCODINGS:
+        quality = request.accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def _compress_stream(iterable, compressor):
+    """Comprime cada bloque de una respuesta en streaming y lo envía de inmediato"""
+    try:
+        for chunk in iterable:
+            data = compressor.compress(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+            data += compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    finally:
+        close = getattr(iterable, "close", None)
+        if close:
+            close()
+
+def compress_response(response):
+    """after_request: comprime la respuesta según Accept-Encoding"""
+    if (
+        request.method == "HEAD"
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or not (response.mimetype or "").startswith(COMPRESSIBLE_TYPES)
+        or (response.mimetype or "").startswith(UNCOMPRESSED_TYPES)
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, COMPRESSORS[encoding]())
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < MIN_SIZE:
+            return response
+        compressor = COMPRESSORS[encoding]()
+        response.set_data(compressor.compress(data) + compressor.finish())
+
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        # Cada representación comprimida lleva su propio ETag fuerte
+        response.set_etag(f"{etag}-{encoding}", weak=weak)
+    return response
@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+import pymongo
+from logger.logger import Logger
+
+# Segundos entre verificaciones de Mongo del hilo de readiness
+CHECK_INTERVAL = float(os.environ.get("READY_CHECK_INTERVAL", 5))
+
+# Segundos máximos que puede tardar el ping
+PING_TIMEOUT = float(os.environ.get("READY_PING_TIMEOUT", 2))
+
+# Fracción de maxPoolSize en uso a partir de la cual el worker deja de estar listo
+MAX_POOL_SATURATION = float(os.environ.get("READY_MAX_POOL_SATURATION", 0.95))
+
+# Segundos máximos desde el último comando exitoso contra Mongo
+MAX_SUCCESS_AGE = float(os.environ.get("READY_MAX_SUCCESS_AGE", 30))
+
+class ReadinessChecker:
+    """Estado de readiness del worker calculado en segundo plano.
+
+    Un hilo por proceso hace ping a Mongo cada CHECK_INTERVAL segundos y
+    guarda el resultado junto con la saturación del pool y la antigüedad del
+    último comando exitoso, de modo que consultar el estado no toca la base.
+    El hilo se inicia con start() al arrancar cada worker o al crearse su
+    cliente de Mongo; si nada lo inició, lo inicia la primera consulta.
+    """
+
+    def __init__(self, db_conn):
+        self.db_conn = db_conn
+        self.logger = Logger()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._last_check = None
+
+    def start(self):
+        """Inicia el hilo de verificación del proceso actual si no está corriendo"""
+        with self._lock:
+            if self._pid != os.getpid() or self._thread is None or not self._thread.is_alive():
+                # Un hilo heredado por fork no existe en este proceso
+                if self._pid != os.getpid():
+                    self._last_check = None
+                self._thread = threading.Thread(target=self._run, name="readiness", daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            self._last_check = self._check()
+            time.sleep(CHECK_INTERVAL)
+
+    def _check(self):
+        """Hace ping a Mongo y regresa el resultado con la hora de la verificación"""
+        try:
+            # Crear el cliente (y sus callbacks on_connect) no cuenta para el
+            # tiempo del ping
+            client = self.db_conn.client
+            started = time.perf_counter()
+            with pymongo.timeout(PING_TIMEOUT):
+                client.admin.command("ping")
+            return {"checked_at": time.time(), "ping_ok": True, "ping_ms": round((time.perf_counter() - started) * 1000, 2)}
+        except Exception as e:
+            self.logger.warning(f"Readiness: ping a MongoDB falló: {e}")
+            return {"checked_at": time.time(), "ping_ok": False, "ping_ms": None, "error": str(e)}
+
+    def status(self):
+        """Regresa (estado, listo) a partir de la última verificación"""
+        self.start()
+        now = time.time()
+        check = self._last_check
+        pool = self.db_conn.pool_stats()
+
+        max_pool_size = pool.get("max_pool_size") or 0
+        saturation = pool.get("connections_checked_out", 0) / max_pool_size if max_pool_size else 0
+        last_success = pool.get("last_success")
+        success_age = now - last_success if last_success else None
+
+        reasons = []
+        if check is None:
+            reasons.append("sin verificación todavía")
+        else:
+            if not check["ping_ok"]:
+                reasons.append("ping a MongoDB falló")
+            if now - check["checked_at"] > 3 * CHECK_INTERVAL + PING_TIMEOUT:
+                reasons.append("la verificación está atrasada")
+        if saturation >= MAX_POOL_SATURATION:
+            reasons.append("pool de conexiones saturado")
+        if success_age is None or success_age > MAX_SUCCESS_AGE:
+            reasons.append("sin comandos exitosos recientes")
+
+        ready = not reasons
+        return {
+            "status": "Ready" if ready else "Unavailable",
+            "pid": os.getpid(),
+            "ping_ms": check["ping_ms"] if check else None,
+            "checked_age_s": round(now - check["checked_at"], 3) if check else None,
+            "pool_saturation": round(saturation, 3),
+            "connections_checked_out": pool.get("connections_checked_out", 0),
+            "max_pool_size": max_pool_size,
+            "last_success_age_s": round(success_age, 3) if success_age is not None else None,
+            "reasons": reasons
+        }, ready
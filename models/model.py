@@ -1,17 +1,53 @@
+import importlib.util
 import os
+import threading
 from logger.logger import Logger
+from models.monitoring import PoolStatsListener
 from pymongo import MongoClient
 
+# Pool and timeout settings read from the environment: variable -> MongoClient option
+POOL_SETTINGS = {
+    "MONGODB_MAX_POOL_SIZE": ("maxPoolSize", int),
+    "MONGODB_MIN_POOL_SIZE": ("minPoolSize", int),
+    "MONGODB_MAX_IDLE_TIME_MS": ("maxIdleTimeMS", int),
+    "MONGODB_WAIT_QUEUE_TIMEOUT_MS": ("waitQueueTimeoutMS", int),
+    "MONGODB_SOCKET_TIMEOUT_MS": ("socketTimeoutMS", int),
+    "MONGODB_CONNECT_TIMEOUT_MS": ("connectTimeoutMS", int),
+    "MONGODB_COMPRESSORS": ("compressors", str),
+    "MONGODB_READ_PREFERENCE": ("readPreference", str),
+}
+
+# Module each wire compressor needs; pymongo silently skips a missing one
+COMPRESSOR_MODULES = {
+    "snappy": "snappy",
+    "zstd": "zstandard",
+    "zlib": "zlib",
+}
+
 class BDModel:
-    """Model class for tickets API that allows to connect to MongoDB"""
+    """Model class for tickets API that allows to connect to MongoDB.
+
+    The MongoClient is created lazily on first use in each process, so
+    gunicorn workers never inherit a client created before the fork.
+    """
     def __init__(self):
-        self.client = None
-        self.db = None
+        self._client = None
+        self._db = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._settings = None
+        self._on_connect = []
+        self.event_listeners = []
+        self.pool_listener = PoolStatsListener()
         self.logger = Logger()
 
     # Function to connect to MongoDB
     def connect_to_database(self):
-        """Function to connect to MongoDB"""
+        """Function to validate and load the MongoDB settings.
+
+        The client itself is created by the first access to `client` or `db`
+        in the current process.
+        """
         mongodb_user = os.environ.get("MONGODB_USER")
         mongodb_pass = os.environ.get("MONGODB_PASS")
         mongodb_host = os.environ.get("MONGODB_HOST")
@@ -32,27 +68,107 @@ class BDModel:
                 "Set environment variables: MONGODB_HOST"
             )
 
+        settings = {
+            "host": mongodb_host,
+            "port": 27017,
+            "username": mongodb_user,
+            "password": mongodb_pass,
+            "authSource": "admin",
+            "authMechanism": "SCRAM-SHA-256",
+            "serverSelectionTimeoutMS": 5000,
+        }
         try:
-            self.client = MongoClient(
-                host=mongodb_host,
-                port=27017,
-                username=mongodb_user,
-                password=mongodb_pass,
-                authSource="admin",
-                authMechanism="SCRAM-SHA-256",
-                serverSelectionTimeoutMS=5000,
+            for variable, (option, cast) in POOL_SETTINGS.items():
+                value = os.environ.get(variable)
+                if value:
+                    settings[option] = cast(value)
+        except ValueError as e:
+            self.logger.critical(f"Invalid MongoDB pool setting: {e}")
+            raise
+
+        for compressor in settings.get("compressors", "").split(","):
+            compressor = compressor.strip()
+            if compressor and (
+                compressor not in COMPRESSOR_MODULES
+                or importlib.util.find_spec(COMPRESSOR_MODULES[compressor]) is None
+            ):
+                self.logger.critical(f"MongoDB compressor not available: {compressor}")
+                raise ValueError(
+                    f"MONGODB_COMPRESSORS: {compressor} is not supported or its module is not installed"
+                )
+
+        self._settings = settings
+
+    def add_event_listener(self, listener):
+        """Register a pymongo monitoring listener for the clients created from now on"""
+        self.event_listeners.append(listener)
+
+    def on_connect(self, callback):
+        """Register a callback run once per process after its client is created"""
+        self._on_connect.append(callback)
+
+    def _ensure_client(self):
+        """Create the client for the current process if it does not exist yet"""
+        if self._client is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                return
+            if self._settings is None:
+                raise RuntimeError("connect_to_database() must be called before using the database")
+
+            # A client inherited through fork must not be used nor closed here
+            self.pool_listener = PoolStatsListener()
+            client = MongoClient(
+                **self._settings,
+                event_listeners=[self.pool_listener, *self.event_listeners],
             )
-            self.db = self.client["project"]
+            try:
+                client.admin.command("ping")
+                self.logger.info(f"Connected to MongoDB successfully (pid {os.getpid()})")
+            except Exception as e:
+                self.logger.critical(f"Error connecting to MongoDB: {e}")
+                client.close()
+                raise
 
-            if self.db.list_collection_names():
-                self.logger.info("Connected to MongoDB successfully")
+            self._client = client
+            self._db = client["project"]
+            self._pid = os.getpid()
 
-        except Exception as e:
-            self.logger.critical(f"Error connecting to MongoDB: {e}")
-            raise
+        for callback in self._on_connect:
+            try:
+                callback()
+            except Exception as e:
+                self.logger.error(f"Error in MongoDB on_connect callback: {e}")
+
+    @property
+    def client(self):
+        self._ensure_client()
+        return self._client
+
+    @property
+    def db(self):
+        self._ensure_client()
+        return self._db
+
+    def pool_stats(self):
+        """Function to get the connection pool statistics of the current worker"""
+        settings = self._settings or {}
+        return {
+            "pid": os.getpid(),
+            "connected": self._client is not None and self._pid == os.getpid(),
+            "max_pool_size": settings.get("maxPoolSize", 100),
+            "min_pool_size": settings.get("minPoolSize", 0),
+            "wait_queue_timeout_ms": settings.get("waitQueueTimeoutMS"),
+            "compressors": settings.get("compressors"),
+            "read_preference": settings.get("readPreference", "primary"),
+            **self.pool_listener.stats()
+        }
 
     def close_connection(self):
         """Function to close the connection to MongoDB"""
-        if self.client:
-            self.client.close()
-            self.logger.info("MongoDB connection closed")
\ No newline at end of file
+        if self._client and self._pid == os.getpid():
+            self._client.close()
+            self._client = None
+            self._db = None
+            self.logger.info("MongoDB connection closed")
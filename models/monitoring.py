@@ -0,0 +1,96 @@
+import threading
+import time
+from pymongo import monitoring
+
+class PoolStatsListener(monitoring.ConnectionPoolListener, monitoring.CommandListener):
+    """Collects per-worker connection pool and command statistics from pymongo's
+    CMAP and command monitoring events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connections_open = 0
+        self.connections_checked_out = 0
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+        self.commands_succeeded = 0
+        self.commands_failed = 0
+        self.command_seconds = 0.0
+        self.last_success = None
+
+    # Connection pool events
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+            self.connections_open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+            self.connections_open -= 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checkouts += 1
+            self.connections_checked_out += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.connections_checked_out -= 1
+
+    # Command events
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        with self._lock:
+            self.commands_succeeded += 1
+            self.command_seconds += event.duration_micros / 1e6
+            self.last_success = time.time()
+
+    def failed(self, event):
+        with self._lock:
+            self.commands_failed += 1
+            self.command_seconds += event.duration_micros / 1e6
+
+    def stats(self):
+        """Return a snapshot of the counters"""
+        with self._lock:
+            return {
+                "connections_open": self.connections_open,
+                "connections_checked_out": self.connections_checked_out,
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "pool_clears": self.pool_clears,
+                "commands_succeeded": self.commands_succeeded,
+                "commands_failed": self.commands_failed,
+                "command_seconds": round(self.command_seconds, 6),
+                "last_success": self.last_success
+            }
@@ -1,6 +1,17 @@
-from flask import Blueprint, request, jsonify
+import queue
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from datetime import datetime, timedelta
+from marshmallow import ValidationError
 from logger.logger import Logger
+from metrics.metrics import render_metrics
+from middleware.compression import compress_response, etag_variants
+from schemas.schema import BulkDeleteSchema, FilterSpecSchema
+from serializers.export import gzip_chunks, iter_csv, iter_xlsx
+from services.live import HEARTBEAT_SECONDS, MAX_SUBSCRIBERS, REJECT_RETRY_SECONDS, LiveCounters
+from services.service import (
+    COUNTER_COLLECTIONS, DASHBOARD_SECTIONS, FILTRO_BATCH_SIZE, FILTRO_COLLECTIONS, FORM_COLLECTIONS, FORM_TYPES,
+    INGEST_MAX_ITEMS
+)
 
 class FileGeneratorRoute(Blueprint):
     """Class to handle the routes for file generation"""
@@ -9,8 +20,12 @@ class FileGeneratorRoute(Blueprint):
         super().__init__("file_generator", __name__)
         self.logger = Logger()
         self.schema = schema
+        self.filter_spec_schema = FilterSpecSchema()
+        self.bulk_delete_schema = BulkDeleteSchema()
         self.service = service
+        self.live = LiveCounters(service, self._live_snapshot, FORM_COLLECTIONS, COUNTER_COLLECTIONS)
         self.register_routes()
+        self.after_request(compress_response)
 
     def register_routes(self): 
         """Function to register the routes for file generation"""
@@ -18,6 +33,8 @@ class FileGeneratorRoute(Blueprint):
         self.route("/api2/v1/weekly-registrations", methods=["GET"])(self.get_weekly_registrations)
         self.route("/api2/v1/old-weekly-registrations", methods=["GET"])(self.get_old_weekly_registrations)
         self.route("/api2/v1/weekly-stats", methods=["GET"])(self.get_weekly_stats)
+        self.route("/api2/v1/events", methods=["GET"])(self.events)
+        self.route("/api2/v1/dashboard", methods=["GET"])(self.get_dashboard)
         self.route("/api2/v1/vpnGet", methods=["POST"])(self.vpnGet)
         self.route("/api2/v1/internetGet", methods=["POST"])(self.internetGet)
         self.route("/api2/v1/telefoniaGet", methods=["POST"])(self.telefoniaGet)
@@ -30,8 +47,16 @@ class FileGeneratorRoute(Blueprint):
         self.route("/api2/v1/borrarInter", methods=["POST"])(self.borrarregistro_Inter)
         self.route("/api2/v1/borrarTel", methods=["POST"])(self.borrarregistro_Tel)
         self.route("/api2/v1/interFiltrado", methods=["POST"])(self.interFiltrado)
+        self.route("/api2/v1/borrarMasivo", methods=["POST"])(self.borrar_masivo)
+        self.route("/api2/v1/ingesta/<tipo>", methods=["POST"])(self.ingestar)
+        self.route("/api2/v1/exportar/<tipo>", methods=["GET", "POST"])(self.exportar)
         self.route("/api2/v1/registroErrores", methods=["GET"])(self.registroErrores)
+        self.route("/api2/v1/search", methods=["GET"])(self.search)
+        self.route("/api2/v1/cache-stats", methods=["GET"])(self.get_cache_stats)
+        self.route("/api2/v1/pool-stats", methods=["GET"])(self.get_pool_stats)
         self.route("/api2/healthcheck", methods=["GET"])(self.healthcheck)
+        self.route("/api2/ready", methods=["GET"])(self.ready)
+        self.route("/api2/metrics", methods=["GET"])(self.metrics)
 
     def fetch_request_data(self):
         """Function to fetch the request data"""
@@ -44,15 +69,108 @@ class FileGeneratorRoute(Blueprint):
             self.logger.error(f"Error fetching request data: {e}")
             return 500, "Error fetching request data", None
         
+    def fetch_pagination_args(self):
+        """Lee del cuerpo los parámetros opcionales de paginación de los listados.
+
+        Acepta limit, after (último _id recibido), fields (lista de campos),
+        total (bool) y since (token de cambios, último noFormato o "" para
+        sincronizar desde cero). Un cuerpo vacío conserva la respuesta completa.
+        """
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            data = {}
+
+        fields = data.get("fields")
+        if fields is not None and (not isinstance(fields, list) or not all(isinstance(f, str) for f in fields)):
+            raise ValueError("fields debe ser una lista de nombres de campo")
+
+        after = data.get("after")
+        if after is not None and not isinstance(after, str):
+            raise ValueError("after debe ser un noFormato")
+
+        return {
+            "limit": data.get("limit"),
+            "after": after,
+            "fields": fields,
+            "with_total": bool(data.get("total", False)),
+            "since": data.get("since")
+        }
+
+    def fetch_filter_spec(self):
+        """Lee la especificación opcional de filtro (filter, sort, fields) del cuerpo.
+
+        Regresa None si el cuerpo no trae ninguna de esas llaves, de modo que
+        las descargas completas se comportan como antes.
+        """
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not {"filter", "sort", "fields"} & data.keys():
+            return None
+        try:
+            return self.filter_spec_schema.load(data)
+        except ValidationError as e:
+            raise ValueError(f"Especificación de filtro inválida: {e.messages}")
+
+    def not_modified(self, etag):
+        """Regresa un 304 si el If-None-Match del cliente contiene etag (en
+        cualquiera de sus variantes comprimidas), si no None"""
+        for variant in etag_variants(etag):
+            if request.if_none_match.contains(variant):
+                response = Response(status=304)
+                response.set_etag(variant)
+                return response
+        return None
+
+    def etag_response(self, data, status_code, etag):
+        """Serializa data y agrega el ETag cuando la respuesta es exitosa"""
+        response = jsonify(data)
+        response.status_code = status_code
+        if status_code == 200:
+            response.set_etag(etag)
+        return response
+
+    def payload_response(self, data, status_code, *extra):
+        """Respuesta con ETag derivado del cuerpo mismo.
+
+        Los agregados pueden salir de la caché por TTL, que no se entera de
+        los formularios que insertan otros servicios; un ETag del cuerpo
+        siempre describe lo que se envía y en un acierto de caché el 304 no
+        cuesta ninguna consulta.
+        """
+        if status_code != 200:
+            return jsonify(data), status_code
+        etag = self.service.get_payload_etag(data, request.path, *extra)
+        not_modified = self.not_modified(etag)
+        if not_modified:
+            return not_modified
+        return self.etag_response(data, status_code, etag)
+
     def get_form_counts(self):
         """Endpoint to get form counts for analytics dashboard"""
         try:
-            analytics_data, status_code = self.service.get_analytics_data()
-            return jsonify(analytics_data), status_code
+            exact = request.args.get("exact", "").lower() in ("1", "true")
+            analytics_data, status_code = self.service.get_analytics_data(exact=exact)
+            return self.payload_response(analytics_data, status_code, exact)
         except Exception as e:
             self.logger.error(f"Error in get_form_counts: {e}")
             return jsonify({"error": "Internal server error"}), 500
         
+    def _weekly_registrations_view(self, start_of_week):
+        """Formatea 6 días de contadores a partir de start_of_week para el frontend"""
+        series = self.service.get_counter_series(COUNTER_COLLECTIONS, start_of_week, start_of_week + timedelta(days=5))
+        return self._format_weekly_series(series)
+
+    def _format_weekly_series(self, series):
+        """Días de get_counter_series en el formato de weekly-registrations"""
+        form_labels = {'vpnMayoCounters': 'VPN', 'internetCounters': 'Internet', 'rfcCounters': 'RFC', 'telCounters': 'Telefono'}
+
+        return [
+            {
+                "Fecha": day["date"].strftime("%d-%m-%Y"),
+                "Cuenta": {form_labels[collection]: count for collection, count in day["counts"].items()}
+            }
+            for day in series
+        ]
+
     def get_weekly_registrations(self):
         """Endpoint to get the number of registrations for the last 6 days."""
         try:
@@ -62,29 +180,91 @@ class FileGeneratorRoute(Blueprint):
 
             start_of_week = today - timedelta(days=days_to_subtract)
 
-            weekly_data = []
-            collections = ['vpnMayoCounters', 'internetCounters', 'rfcCounters', 'telCounters']
-            form_labels = {'vpnMayoCounters': 'VPN', 'internetCounters': 'Internet', 'rfcCounters': 'RFC', 'telCounters': 'Telefono'}
-
-            for i in range(6):  # Get data for the last 6 days (including today if it's within the week)
-                current_date = start_of_week + timedelta(days=i)
-                formatted_date = current_date.strftime("%y%m%d")
+            weekly_data = self._weekly_registrations_view(start_of_week)
 
-                daily_counts = {}
-                for collection in collections:
-                    record = self.service.get_daily_registration_count(collection, formatted_date)
-                    daily_counts[form_labels[collection]] = record['seq'] if record else 0
-                
-                weekly_data.append({
-                    "Fecha": current_date.strftime("%d-%m-%Y"),
-                    "Cuenta": daily_counts
-                })
-
-            return jsonify(weekly_data), 200
+            return self.payload_response(weekly_data, 200)
         except Exception as e:
             self.logger.error(f"Error in get_weekly_registrations: {e}")
             return jsonify({"error": "Internal server error"}), 500
         
+    def get_dashboard(self):
+        """Endpoint con las secciones del dashboard en una sola respuesta.
+
+        sections (separadas por comas) elige cuáles calcular; por defecto
+        form-counts, weekly-registrations, old-weekly-registrations y
+        weekly-stats. Cada sección tiene el mismo cuerpo que su endpoint.
+        """
+        try:
+            sections = [section.strip() for section in request.args.get("sections", "").split(",") if section.strip()]
+            unknown = [section for section in sections if section not in DASHBOARD_SECTIONS]
+            if unknown:
+                return jsonify({"error": f"Secciones desconocidas: {', '.join(unknown)}"}), 400
+            sections = sections or DASHBOARD_SECTIONS
+
+            dashboard, status_code = self.service.get_dashboard(sections)
+            if status_code != 200:
+                return jsonify(dashboard), status_code
+
+            # counter-series son 14 días desde el lunes de la semana pasada
+            series = dashboard.pop("counter-series", None)
+            if "old-weekly-registrations" in sections:
+                dashboard["old-weekly-registrations"] = self._format_weekly_series(series[0:6])
+            if "weekly-registrations" in sections:
+                dashboard["weekly-registrations"] = self._format_weekly_series(series[7:13])
+            return self.payload_response(dashboard, 200)
+        except Exception as e:
+            self.logger.error(f"Error in get_dashboard: {e}")
+            return jsonify({"error": "Internal server error"}), 500
+
+    def _live_snapshot(self):
+        """Instantánea de los contadores que se difunden por SSE"""
+        today = datetime.now()
+        start_of_week = today - timedelta(days=today.weekday())
+        snapshot = {"weekly-registrations": self._weekly_registrations_view(start_of_week)}
+        analytics_data, status_code = self.service.get_analytics_data()
+        if status_code == 200:
+            snapshot["form-counts"] = analytics_data
+        return snapshot
+
+    def events(self):
+        """Server-Sent Events con form-counts y weekly-registrations.
+
+        Envía la instantánea actual al conectarse y después solo los eventos
+        que cambian; cada evento lleva el mismo cuerpo que su endpoint.
+        """
+        subscriber = self.live.subscribe()
+        if subscriber is None:
+            # Sin lugar en este worker: el cliente reintenta más tarde (o en otro worker)
+            self.logger.warning(f"Events: límite de {MAX_SUBSCRIBERS} clientes alcanzado")
+            return Response(
+                f"retry: {REJECT_RETRY_SECONDS * 1000}\n\n",
+                status=503,
+                mimetype="text/event-stream",
+                headers={"Retry-After": str(REJECT_RETRY_SECONDS), "Cache-Control": "no-cache"}
+            )
+        dumps = current_app.json.dumps
+
+        def generate():
+            try:
+                yield "retry: 5000\n\n"
+                while True:
+                    try:
+                        changed = subscriber.get(timeout=HEARTBEAT_SECONDS)
+                    except queue.Empty:
+                        yield ": ping\n\n"
+                        continue
+                    for name, data in changed.items():
+                        payload = dumps(data).replace("\n", "\ndata: ")
+                        yield f"event: {name}\ndata: {payload}\n\n"
+            finally:
+                self.live.unsubscribe(subscriber)
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
     def get_old_weekly_registrations(self):
         """Endpoint to get the number of registrations for the last 6 days."""
         try:
@@ -98,25 +278,9 @@ class FileGeneratorRoute(Blueprint):
             # Calculate the Monday of the PREVIOUS week
             start_of_previous_week = current_monday - timedelta(weeks=1)
 
-            weekly_data = []
-            collections = ['vpnMayoCounters', 'internetCounters', 'rfcCounters', 'telCounters']
-            form_labels = {'vpnMayoCounters': 'VPN', 'internetCounters': 'Internet', 'rfcCounters': 'RFC', 'telCounters': 'Telefono'}
+            weekly_data = self._weekly_registrations_view(start_of_previous_week)
 
-            for i in range(6):  # Get data for the last 6 days (including today if it's within the week)
-                current_date = start_of_previous_week + timedelta(days=i)
-                formatted_date = current_date.strftime("%y%m%d")
-
-                daily_counts = {}
-                for collection in collections:
-                    record = self.service.get_daily_registration_count(collection, formatted_date)
-                    daily_counts[form_labels[collection]] = record['seq'] if record else 0
-                
-                weekly_data.append({
-                    "Fecha": current_date.strftime("%d-%m-%Y"),
-                    "Cuenta": daily_counts
-                })
-
-            return jsonify(weekly_data), 200
+            return self.payload_response(weekly_data, 200)
         except Exception as e:
             self.logger.error(f"Error in get_weekly_registrations: {e}")
             return jsonify({"error": "Internal server error"}), 500
@@ -125,7 +289,7 @@ class FileGeneratorRoute(Blueprint):
         """Endpoint para obtener estadísticas semanales con porcentajes de cambio"""
         try:
             weekly_stats, status_code = self.service.get_weekly_registration_stats()
-            return jsonify(weekly_stats), status_code
+            return self.payload_response(weekly_stats, status_code)
         except Exception as e:
             self.logger.error(f"Error in get_weekly_stats: {e}")
             return jsonify({"error": "Internal server error"}), 500
@@ -133,30 +297,51 @@ class FileGeneratorRoute(Blueprint):
     def vpnGet(self):
         """Endpoint para obtener los datos de VPN"""
         try:
-            vpn_data, status_code = self.service.VPN_Registros_Resumen()
+            pagination_args = self.fetch_pagination_args()
+            etag = self.service.get_etag(['vpnMayo'], request.path, request.get_data())
+            not_modified = self.not_modified(etag)
+            if not_modified:
+                return not_modified
+            vpn_data, status_code = self.service.VPN_Registros_Resumen(**pagination_args)
             self.logger.debug("Datos obtenidos de VPN: ")
             self.logger.debug(vpn_data)
-            return jsonify(vpn_data), status_code
+            return self.etag_response(vpn_data, status_code, etag)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             self.logger.error(f"Error en get_vpn_registrations: {e}")
             return jsonify({"error": "Internal server error"}), 500
     def internetGet(self):
         """Endpoint para obtener los datos de VPN"""
         try:
-            internet_data, status_code = self.service.Internet_Registros_Resumen()
+            pagination_args = self.fetch_pagination_args()
+            etag = self.service.get_etag(['internet'], request.path, request.get_data())
+            not_modified = self.not_modified(etag)
+            if not_modified:
+                return not_modified
+            internet_data, status_code = self.service.Internet_Registros_Resumen(**pagination_args)
             self.logger.debug("Datos obtenidos de Internet: ")
             self.logger.debug(internet_data)
-            return jsonify(internet_data), status_code
+            return self.etag_response(internet_data, status_code, etag)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             self.logger.error(f"Error en get_internet_registrations: {e}")
             return jsonify({"error": "Internal server error"}), 500
     def telefoniaGet(self):
         """Endpoint para obtener los datos de VPN"""
         try:
-            telefonia_data, status_code = self.service.Telefonia_Registros_Resumen()
+            pagination_args = self.fetch_pagination_args()
+            etag = self.service.get_etag(['tel'], request.path, request.get_data())
+            not_modified = self.not_modified(etag)
+            if not_modified:
+                return not_modified
+            telefonia_data, status_code = self.service.Telefonia_Registros_Resumen(**pagination_args)
             self.logger.debug("Datos obtenidos de Telefonia: ")
             self.logger.debug(telefonia_data)
-            return jsonify(telefonia_data), status_code
+            return self.etag_response(telefonia_data, status_code, etag)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             self.logger.error(f"Error en get_telefonia_registrations: {e}")
             return jsonify({"error": "Internal server error"}), 500
@@ -164,22 +349,126 @@ class FileGeneratorRoute(Blueprint):
     def rfcGet(self):
         """Endpoint para obtener los datos de VPN"""
         try:
-            rfc_data, status_code = self.service.RFC_Registros_Resumen()
+            pagination_args = self.fetch_pagination_args()
+            etag = self.service.get_etag(['rfc'], request.path, request.get_data())
+            not_modified = self.not_modified(etag)
+            if not_modified:
+                return not_modified
+            rfc_data, status_code = self.service.RFC_Registros_Resumen(**pagination_args)
             self.logger.debug("Datos obtenidos de RFC: ")
             self.logger.debug(rfc_data)
-            return jsonify(rfc_data), status_code
+            return self.etag_response(rfc_data, status_code, etag)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             self.logger.error(f"Error en get_rfc_registrations: {e}")
             return jsonify({"error": "Internal server error"}), 500
         
+    def stream_filtro(self, tipo, stream_format, spec=None):
+        """Descarga en streaming de una colección filtrada.
+
+        stream_format "ndjson" emite un documento JSON por línea; "json" emite un
+        arreglo JSON bien formado. Los documentos se serializan por lotes conforme
+        llegan del cursor, así que la memoria por petición es constante.
+        """
+        if stream_format not in ("ndjson", "json"):
+            return jsonify({"error": "stream debe ser 'ndjson' o 'json'"}), 400
+
+        cursor = self.service.Filtro_Cursor(tipo, FILTRO_BATCH_SIZE, spec)
+
+        def generate():
+            dumps = current_app.json.dumps
+            separator = "\n" if stream_format == "ndjson" else ","
+            first = True
+            batch = []
+            try:
+                if stream_format == "json":
+                    yield "["
+                for document in cursor:
+                    batch.append(dumps(document))
+                    if len(batch) >= FILTRO_BATCH_SIZE:
+                        yield ("" if first else separator) + separator.join(batch)
+                        first = False
+                        batch = []
+                if batch:
+                    yield ("" if first else separator) + separator.join(batch)
+                    first = False
+                if stream_format == "json":
+                    yield "]"
+                elif not first:
+                    yield "\n"
+            except Exception as e:
+                self.logger.error(f"Error en la descarga en streaming de {tipo}: {e}")
+            finally:
+                cursor.close()
+
+        mimetype = "application/x-ndjson" if stream_format == "ndjson" else "application/json"
+        return Response(stream_with_context(generate()), mimetype=mimetype)
+
+    def exportar(self, tipo):
+        """Exporta en streaming un tipo de formulario a CSV (opcionalmente gzip) o XLSX.
+
+        Parámetros: formato=csv|xlsx, origen=filtrado|resumen, gzip=1. Con
+        origen filtrado el cuerpo acepta la misma especificación de filtro que
+        los endpoints *Filtrado.
+        """
+        try:
+            if tipo not in FILTRO_COLLECTIONS:
+                return jsonify({"error": f"Tipo de formulario desconocido: {tipo}"}), 404
+            formato = request.args.get("formato", "csv")
+            origen = request.args.get("origen", "filtrado")
+            use_gzip = request.args.get("gzip", "").lower() in ("1", "true")
+            if formato not in ("csv", "xlsx") or origen not in ("filtrado", "resumen"):
+                return jsonify({"error": "formato debe ser csv o xlsx y origen filtrado o resumen"}), 400
+
+            spec = self.fetch_filter_spec() if origen == "filtrado" else None
+            columns, documents = self.service.Exportar_Cursor(tipo, origen, spec)
+            dumps = current_app.json.dumps
+            filename = f"{tipo}_{origen}.{formato}"
+
+            if formato == "xlsx":
+                chunks = iter_xlsx(columns, documents, dumps)
+                mimetype = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            elif use_gzip:
+                chunks = gzip_chunks(iter_csv(columns, documents, dumps, FILTRO_BATCH_SIZE))
+                mimetype = "application/gzip"
+                filename += ".gz"
+            else:
+                chunks = iter_csv(columns, documents, dumps, FILTRO_BATCH_SIZE)
+                mimetype = "text/csv"
+
+            def generate():
+                try:
+                    yield from chunks
+                except Exception as e:
+                    self.logger.error(f"Error en la exportación de {tipo}: {e}")
+                finally:
+                    if hasattr(documents, "close"):
+                        documents.close()
+
+            response = Response(stream_with_context(generate()), mimetype=mimetype)
+            response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+            return response
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            self.logger.error(f"Error en exportar:{e}")
+            return jsonify({"error": "Internal server error"}), 500
+
     # filepath: routes.py
     def rfcFiltrado(self):
         """Filtrado ya hecho en mongodb"""
         try: 
-            rfc_filter_data, status_code = self.service.RFC_Filtro()
+            spec = self.fetch_filter_spec()
+            stream_format = request.args.get("stream")
+            if stream_format:
+                return self.stream_filtro("rfc", stream_format, spec)
+            rfc_filter_data, status_code = self.service.RFC_Filtro(spec)
             self.logger.debug("Datos obtenidos del filtro de RFC")
             self.logger.debug(rfc_filter_data)
             return jsonify(rfc_filter_data), status_code
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             self.logger.error(f"Error en rfc_filtrado:{e}")
             return jsonify({"error": "Internal server error"}), 500
@@ -187,30 +476,48 @@ class FileGeneratorRoute(Blueprint):
     def telFiltrado(self):
         """Filtrado ya hecho en mongodb"""
         try: 
-            tel_filter_data, status_code = self.service.Telefonia_Filtro()
+            spec = self.fetch_filter_spec()
+            stream_format = request.args.get("stream")
+            if stream_format:
+                return self.stream_filtro("tel", stream_format, spec)
+            tel_filter_data, status_code = self.service.Telefonia_Filtro(spec)
             self.logger.debug("Datos obtenidos del filtro de Telefonia")
             self.logger.debug(tel_filter_data)
             return jsonify(tel_filter_data), status_code
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             self.logger.error(f"Error en rfc_filtrado:{e}")
             return jsonify({"error": "Internal server error"}), 500
     def vpnFiltrado(self):
         """Filtrado ya hecho en mongodb"""
         try: 
-            vpn_filter_data, status_code = self.service.VPN_Filtro()
+            spec = self.fetch_filter_spec()
+            stream_format = request.args.get("stream")
+            if stream_format:
+                return self.stream_filtro("vpn", stream_format, spec)
+            vpn_filter_data, status_code = self.service.VPN_Filtro(spec)
             self.logger.debug("Datos obtenidos del filtro de VPN")
             self.logger.debug(vpn_filter_data)
             return jsonify(vpn_filter_data), status_code
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             self.logger.error(f"Error en vpn_filtrado:{e}")
             return jsonify({"error": "Internal server error"}), 500
     def interFiltrado(self):
         """Filtrado ya hecho en mongodb"""
         try: 
-            inter_filter_data, status_code = self.service.Inter_Filtro()
+            spec = self.fetch_filter_spec()
+            stream_format = request.args.get("stream")
+            if stream_format:
+                return self.stream_filtro("inter", stream_format, spec)
+            inter_filter_data, status_code = self.service.Inter_Filtro(spec)
             self.logger.debug("Datos obtenidos del filtro de Internet")
             self.logger.debug(inter_filter_data)
             return jsonify(inter_filter_data), status_code
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             self.logger.error(f"Error en inter_filtrado:{e}")
             return jsonify({"error": "Internal server error"}), 500
@@ -293,15 +600,150 @@ class FileGeneratorRoute(Blueprint):
         except Exception as e:
             self.logger.error(f"Error en borrar registro:{e}")
             return jsonify({"error": "Internal server error"}), 500
+    def borrar_masivo(self):
+        """Borra en lote registros de varios tipos de formulario"""
+        try:
+            data = request.get_json(silent=True)
+            if not isinstance(data, dict):
+                return jsonify({"error": "Invalid data"}), 400
+            try:
+                spec = self.bulk_delete_schema.load(data)
+            except ValidationError as e:
+                return jsonify({"error": "Invalid data", "detalles": e.messages}), 400
+
+            resultado, status_code = self.service.borrar_registros_masivo(spec["ids"], spec["transaccion"])
+            if status_code == 200:
+                self.logger.info(f"Borrado masivo: {resultado['eliminados']} registros eliminados")
+            return jsonify(resultado), status_code
+        except Exception as e:
+            self.logger.error(f"Error en borrar_masivo:{e}")
+            return jsonify({"error": "Internal server error"}), 500
+
+    def ingestar(self, tipo):
+        """Ingesta en lote de formularios validados con el Schema.
+
+        El cuerpo es una lista de formularios o {"formularios": [...],
+        "transaccion": bool}. Los formularios inválidos se reportan por índice
+        y no impiden insertar los demás.
+        """
+        try:
+            if tipo not in FORM_TYPES:
+                return jsonify({"error": f"Tipo de formulario desconocido: {tipo}"}), 404
+            data = request.get_json(silent=True)
+            formularios = data.get("formularios") if isinstance(data, dict) else data
+            transaccion = data.get("transaccion", False) if isinstance(data, dict) else False
+            if not isinstance(formularios, list) or not formularios or not isinstance(transaccion, bool):
+                return jsonify({"error": "Invalid data"}), 400
+            if len(formularios) > INGEST_MAX_ITEMS:
+                return jsonify({"error": f"Se aceptan a lo más {INGEST_MAX_ITEMS} formularios por petición"}), 400
+
+            errores = self.schema.validate(formularios, many=True)
+            validos = [index for index in range(len(formularios)) if index not in errores]
+            cargados = self.schema.load([formularios[index] for index in validos], many=True) if validos else []
+
+            resultado = {"insertados": 0, "errores": {}}
+            if cargados:
+                resultado, status_code = self.service.ingestar_formularios(tipo, list(zip(validos, cargados)), transaccion)
+                if status_code != 200:
+                    return jsonify(resultado), status_code
+            errores = {**errores, **resultado["errores"]}
+            resultado["errores"] = {str(index): errores[index] for index in sorted(errores)}
+
+            self.logger.info(f"Ingesta {tipo}: {resultado['insertados']} insertados, {len(errores)} con errores")
+            return jsonify(resultado), 200 if resultado["insertados"] else 400
+        except Exception as e:
+            self.logger.error(f"Error en ingestar:{e}")
+            return jsonify({"error": "Internal server error"}), 500
+
+    def search(self):
+        """Busca formularios por prefijo de nombre, correo, jefe o ticket.
+
+        Parámetros: q (texto), tipos (p. ej. rfc,vpn), limit (20 por defecto)
+        y offset.
+        """
+        try:
+            tipos = [tipo.strip() for tipo in request.args.get("tipos", "").split(",") if tipo.strip()]
+            try:
+                limit = int(request.args.get("limit", 20))
+                offset = int(request.args.get("offset", 0))
+            except ValueError:
+                return jsonify({"error": "limit y offset deben ser enteros"}), 400
+            search_data, status_code = self.service.buscar_registros(
+                request.args.get("q", ""), tipos or None, limit, offset
+            )
+            return jsonify(search_data), status_code
+        except Exception as e:
+            self.logger.error(f"Error in search: {e}")
+            return jsonify({"error": "Internal server error"}), 500
+
     def registroErrores(self):
-        """Registro de errores"""
+        """Registro de errores.
+
+        Parámetros: desde y hasta (YYYY-MM-DD o ISO 8601; hasta es
+        exclusivo), base (una o varias separadas por comas), limit y after
+        para paginar, y resumen=1 para el conteo por base de datos y día.
+        """
         try: 
-            analytic_data, status_code = self.service.obtener_registro_errores()
+            args = request.args
+            try:
+                desde = datetime.fromisoformat(args["desde"]) if args.get("desde") else None
+                hasta = datetime.fromisoformat(args["hasta"]) if args.get("hasta") else None
+                limit = int(args["limit"]) if args.get("limit") else None
+            except ValueError:
+                return jsonify({"error": "desde/hasta deben ser fechas ISO y limit un entero"}), 400
+            bases = [base.strip() for base in args.get("base", "").split(",") if base.strip()]
+            analytic_data, status_code = self.service.obtener_registro_errores(
+                desde=desde,
+                hasta=hasta,
+                bases=bases or None,
+                limit=limit,
+                after=args.get("after"),
+                resumen=args.get("resumen", "").lower() in ("1", "true")
+            )
             return jsonify(analytic_data), status_code
         except Exception as e:
             self.logger.error(f"Error en errores_filtrado:{e}")
             return jsonify({"error": "Internal server error"}), 500
                 
+    def get_cache_stats(self):
+        """Endpoint con los aciertos y fallos de la caché de agregados del worker"""
+        try:
+            cache_stats, status_code = self.service.get_cache_stats()
+            return jsonify(cache_stats), status_code
+        except Exception as e:
+            self.logger.error(f"Error in get_cache_stats: {e}")
+            return jsonify({"error": "Internal server error"}), 500
+
+    def get_pool_stats(self):
+        """Endpoint con las estadísticas del pool de conexiones de Mongo del worker"""
+        try:
+            pool_stats, status_code = self.service.get_pool_stats()
+            return jsonify(pool_stats), status_code
+        except Exception as e:
+            self.logger.error(f"Error in get_pool_stats: {e}")
+            return jsonify({"error": "Internal server error"}), 500
+
+    def metrics(self):
+        """Endpoint con las métricas de latencia y de Mongo en formato Prometheus"""
+        try:
+            return render_metrics()
+        except Exception as e:
+            self.logger.error(f"Error in metrics: {e}")
+            return jsonify({"error": "Internal server error"}), 500
+
+    def ready(self):
+        """Readiness del worker: 503 si perdió MongoDB o tiene el pool saturado.
+
+        A diferencia de healthcheck (liveness) refleja el estado de la base,
+        pero sin consultarla: lee el resultado del hilo de verificación.
+        """
+        try:
+            readiness, status_code = self.service.get_readiness()
+            return jsonify(readiness), status_code
+        except Exception as e:
+            self.logger.error(f"Error in ready: {e}")
+            return jsonify({"status": "Unavailable", "error": "Internal server error"}), 503
+
     def healthcheck(self):
         """Function to check the health of the services API inside the docker container"""
         return jsonify({"status": "Up"}), 200
\ No newline at end of file
@@ -1,4 +1,5 @@
-from marshmallow import Schema, fields, validate
+from marshmallow import EXCLUDE, Schema, fields, validate
+from marshmallow import Schema as BaseSchema
 
 class Schema(Schema):
     nombre = fields.String(required=True, validate=validate.Length(min=1, max=64))
@@ -22,3 +23,41 @@ class Schema(Schema):
     vigencia = fields.String(required=True, validate=validate.OneOf(["SI", "NO"]))
     so = fields.String(required=True, validate=validate.OneOf(["SI", "NO"]))
     licencia = fields.String(required=True, validate=validate.OneOf(["SI", "NO"]))
+
+
+class BulkDeleteSchema(BaseSchema):
+    """Borrado masivo: {"ids": {tipo: [noFormato, ...]}, "transaccion": bool}"""
+    ids = fields.Dict(
+        keys=fields.String(validate=validate.OneOf(["rfc", "vpn", "tel", "inter"])),
+        values=fields.List(
+            fields.String(validate=validate.Length(min=6, max=32)),
+            validate=validate.Length(min=1, max=1000)
+        ),
+        required=True,
+        validate=validate.Length(min=1)
+    )
+    transaccion = fields.Boolean(load_default=False)
+
+
+class SortSpecSchema(BaseSchema):
+    campo = fields.String(required=True, data_key="field", validate=validate.Length(min=1, max=64))
+    direccion = fields.String(load_default="asc", data_key="direction", validate=validate.OneOf(["asc", "desc"]))
+
+
+class FilterSpecSchema(BaseSchema):
+    """Especificación de filtro para los endpoints *Filtrado"""
+    class Meta:
+        unknown = EXCLUDE
+
+    filtro = fields.Dict(
+        keys=fields.String(validate=validate.Length(min=1, max=64)),
+        values=fields.Raw(allow_none=True),
+        load_default=dict,
+        data_key="filter"
+    )
+    orden = fields.List(fields.Nested(SortSpecSchema), load_default=list, data_key="sort")
+    campos = fields.List(
+        fields.String(validate=validate.Length(min=1, max=64)),
+        load_default=None,
+        data_key="fields"
+    )
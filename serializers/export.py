@@ -0,0 +1,87 @@
+import csv
+import io
+import os
+import tempfile
+import zlib
+from datetime import date, datetime
+import xlsxwriter
+
+# Filas máximas de una hoja de Excel (incluye el encabezado)
+XLSX_MAX_ROWS = 1048576
+
+# Caracteres con los que Excel/LibreOffice interpretan una celda de CSV como
+# fórmula; esas celdas se exportan con un apóstrofo al inicio
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def cell_value(value, dumps):
+    """Convierte un valor de Mongo en una celda: escalares tal cual, fechas en
+    ISO 8601 y documentos/listas como JSON con el serializador de la app"""
+    if value is None:
+        return ""
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)) or hasattr(value, "keys"):
+        return dumps(value)
+    return str(value)
+
+def csv_cell(value):
+    """Neutraliza los textos que una hoja de cálculo evaluaría como fórmula"""
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def iter_csv(columns, documents, dumps, batch_size=500):
+    """Genera el CSV por bloques de batch_size filas.
+
+    Empieza con BOM para que Excel detecte UTF-8 en los acentos.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow([csv_cell(column) for column in columns])
+    for index, document in enumerate(documents, 1):
+        writer.writerow([csv_cell(cell_value(document.get(column), dumps)) for column in columns])
+        if index % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def iter_xlsx(columns, documents, dumps, chunk_size=64 * 1024):
+    """Escribe un XLSX en modo constant_memory a un archivo temporal y lo envía
+    por bloques. Solo la fila actual vive en memoria; el archivo se envía
+    cuando el libro está completo. Las filas después de XLSX_MAX_ROWS se omiten.
+    Los textos se escriben siempre como texto, nunca como fórmulas ni enlaces.
+    """
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        workbook = xlsxwriter.Workbook(path, {
+            "constant_memory": True,
+            "strings_to_formulas": False,
+            "strings_to_urls": False,
+        })
+        worksheet = workbook.add_worksheet()
+        worksheet.write_row(0, 0, columns)
+        for row, document in enumerate(documents, 1):
+            if row >= XLSX_MAX_ROWS:
+                break
+            worksheet.write_row(row, 0, [cell_value(document.get(column), dumps) for column in columns])
+        workbook.close()
+
+        with open(path, "rb") as xlsx_file:
+            while chunk := xlsx_file.read(chunk_size):
+                yield chunk
+    finally:
+        os.remove(path)
+
+def gzip_chunks(chunks, level=6):
+    """Comprime al vuelo un flujo de bloques de texto o bytes en formato gzip"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,76 @@
+import decimal
+from bson import Decimal128, ObjectId, decode
+from bson.raw_bson import RawBSONDocument
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+class BSONJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson with handlers for BSON types.
+
+    The output matches Flask's default provider (sorted keys, dates in HTTP
+    format, Decimal as string), except that non-ASCII characters are written
+    as UTF-8 instead of \\u escapes. The compact separators and indent=2
+    that Flask passes from response() map to orjson options; any other
+    json.dumps argument, values orjson rejects and environments without
+    orjson fall back to the standard library encoder.
+    """
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, ObjectId):
+            return str(o)
+        if isinstance(o, Decimal128):
+            return str(o.to_decimal())
+        if isinstance(o, RawBSONDocument):
+            return decode(o.raw)
+        if isinstance(o, decimal.Decimal):
+            return str(o)
+        return DefaultJSONProvider.default(o)
+
+    def _orjson_options(self, indent=None):
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def _orjson_dumps(self, obj, kwargs):
+        """Serialize with orjson to bytes, or None when the stdlib must be used"""
+        if orjson is None:
+            return None
+        kwargs = dict(kwargs)
+        indent = kwargs.pop("indent", None)
+        separators = kwargs.pop("separators", None)
+        if kwargs or indent not in (None, 2) or separators not in (None, (",", ":")):
+            return None
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._orjson_options(indent))
+        except orjson.JSONEncodeError:
+            return None
+
+    def dumps(self, obj, **kwargs):
+        data = self._orjson_dumps(obj, kwargs)
+        if data is not None:
+            return data.decode()
+        kwargs.setdefault("default", self.default)
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        """Serialize like DefaultJSONProvider.response, writing orjson's bytes
+        directly into the response body"""
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = 2 if (self.compact is None and self._app.debug) or self.compact is False else None
+        data = self._orjson_dumps(obj, {"indent": indent} if indent else {})
+        if data is None:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(data + b"\n", mimetype=self.mimetype)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
@@ -0,0 +1,72 @@
+import threading
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """In-process response cache with per-entry TTL and LRU eviction.
+
+    Each entry is tagged with the collections it was computed from so that
+    writes to a collection can invalidate every dependent entry. Every gunicorn
+    worker holds its own instance; the TTL bounds how stale a worker can be
+    after a write handled by another worker.
+    """
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Return (True, value) for a live entry or (False, None) otherwise"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def set(self, key, value, ttl, tags=()):
+        """Store value for ttl seconds, evicting the least recently used entries"""
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value, frozenset(tags))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, tag):
+        """Drop every entry computed from the collection `tag`"""
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if tag in entry[2]]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters and the current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "max_size": self.max_size
+            }
@@ -0,0 +1,78 @@
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+import pymongo
+from logger.logger import Logger
+
+# Hilos compartidos por worker para consultar varias colecciones en paralelo
+FANOUT_WORKERS = int(os.environ.get("MONGO_FANOUT_WORKERS", 8))
+
+# Segundos máximos por consulta de un fan-out
+FANOUT_TIMEOUT = float(os.environ.get("MONGO_FANOUT_TIMEOUT", 10))
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+_local = threading.local()
+logger = Logger()
+
+def _get_executor():
+    """Regresa el pool del proceso actual, creándolo después del fork si hace falta"""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="mongo-fanout")
+            _executor_pid = os.getpid()
+        return _executor
+
+def _run(fn, item, timeout):
+    _local.in_fanout = True
+    try:
+        # El timeout de pymongo también se aplica del lado del servidor (maxTimeMS)
+        with pymongo.timeout(timeout):
+            return fn(item)
+    finally:
+        _local.in_fanout = False
+
+def fan_out(fn, items, timeout=None):
+    """Ejecuta fn(item) para cada item en el pool compartido.
+
+    Regresa (resultados, errores), ambos diccionarios indexados por item, de
+    modo que una colección lenta o caída no tumba la respuesta completa. Un
+    fan-out lanzado desde un hilo del pool se ejecuta en línea para no agotar
+    el pool esperando a sus propias tareas.
+    """
+    timeout = FANOUT_TIMEOUT if timeout is None else timeout
+    results, errors = {}, {}
+
+    if getattr(_local, "in_fanout", False):
+        for item in items:
+            try:
+                results[item] = fn(item)
+            except Exception as e:
+                logger.error(f"Fan-out task {item} failed: {e}")
+                errors[item] = e
+        return results, errors
+
+    executor = _get_executor()
+    futures = {
+        executor.submit(contextvars.copy_context().run, _run, fn, item, timeout): item
+        for item in items
+    }
+    done, not_done = wait(futures, timeout=timeout)
+
+    for future in done:
+        item = futures[future]
+        try:
+            results[item] = future.result()
+        except Exception as e:
+            logger.error(f"Fan-out task {item} failed: {e}")
+            errors[item] = e
+    for future in not_done:
+        item = futures[future]
+        future.cancel()
+        logger.error(f"Fan-out task {item} timed out after {timeout}s")
+        errors[item] = TimeoutError(f"{item} timed out after {timeout}s")
+
+    return results, errors
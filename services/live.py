@@ -0,0 +1,152 @@
+import os
+import queue
+import threading
+import time
+from pymongo.errors import PyMongoError
+from logger.logger import Logger
+
+# Segundos entre revisiones del poller cuando no hay change streams
+POLL_INTERVAL = float(os.environ.get("SSE_POLL_INTERVAL", 5))
+
+# Segundos mínimos entre dos recálculos disparados por change streams
+DEBOUNCE_SECONDS = float(os.environ.get("SSE_DEBOUNCE", 1))
+
+# Segundos sin eventos tras los que se envía un comentario de keep-alive
+HEARTBEAT_SECONDS = float(os.environ.get("SSE_HEARTBEAT", 15))
+
+# Eventos pendientes por cliente; a un cliente lento se le descartan los más viejos
+SUBSCRIBER_QUEUE_SIZE = 16
+
+# Clientes SSE por worker. Cada cliente ocupa uno de los GUNICORN_THREADS
+# hilos mientras está conectado; por defecto se reserva la mitad para las
+# demás peticiones y nunca se permiten tantos clientes como hilos.
+WORKER_THREADS = int(os.environ.get("GUNICORN_THREADS", 16))
+MAX_SUBSCRIBERS = max(1, min(int(os.environ.get("SSE_MAX_CLIENTS", WORKER_THREADS // 2)), WORKER_THREADS - 1))
+
+# Segundos que se le piden esperar a un cliente rechazado antes de reintentar
+REJECT_RETRY_SECONDS = 30
+
+class LiveCounters:
+    """Difunde a los clientes SSE de un worker los contadores del dashboard.
+
+    Un solo hilo por proceso vigila las colecciones y recalcula la
+    instantánea solo cuando cambian, sin importar cuántos clientes estén
+    conectados. Con replica set usa change streams sobre las colecciones
+    vigiladas; sin replica set revisa cada POLL_INTERVAL segundos las
+    versiones baratas de las colecciones de formularios (los *Counters se
+    escriben junto con su formulario). El hilo se detiene cuando se
+    desconecta el último cliente.
+    """
+
+    def __init__(self, service, compute_snapshot, form_collections, counter_collections):
+        self.service = service
+        # compute_snapshot() -> {nombre_evento: datos}
+        self.compute_snapshot = compute_snapshot
+        self.form_collections = list(form_collections)
+        self.watched = self.form_collections + list(counter_collections)
+        self.logger = Logger()
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._snapshot = None
+        self._thread = None
+        self._pid = None
+
+    def subscribe(self):
+        """Registra un cliente y regresa su cola de eventos con la instantánea
+        actual, o None si el worker ya tiene MAX_SUBSCRIBERS clientes"""
+        subscriber = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            if self._pid != os.getpid():
+                # Un hilo heredado por fork no existe en este proceso
+                self._subscribers, self._thread, self._snapshot = set(), None, None
+                self._pid = os.getpid()
+            if len(self._subscribers) >= MAX_SUBSCRIBERS:
+                return None
+            self._subscribers.add(subscriber)
+            snapshot = self._snapshot
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="live-counters", daemon=True)
+                self._thread.start()
+        if snapshot is not None:
+            subscriber.put_nowait(snapshot)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def _publish(self, changed):
+        """Encola los eventos que cambiaron en cada cliente"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            while True:
+                try:
+                    subscriber.put_nowait(changed)
+                    break
+                except queue.Full:
+                    try:
+                        subscriber.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def _refresh(self, collections):
+        """Invalida la caché de las colecciones que cambiaron y publica lo nuevo"""
+        for collection_name in collections:
+            self.service.cache.invalidate(collection_name)
+        snapshot = self.compute_snapshot()
+        previous = self._snapshot or {}
+        changed = {name: data for name, data in snapshot.items() if previous.get(name) != data}
+        self._snapshot = snapshot
+        if changed:
+            self._publish(changed)
+
+    def _active(self):
+        return self.subscriber_count() > 0
+
+    def _run(self):
+        while self._active():
+            try:
+                self._refresh(self.watched)
+                hello = self.service.db_conn.client.admin.command("hello")
+                if "setName" in hello:
+                    self._watch_changes()
+                else:
+                    self._poll()
+            except PyMongoError as e:
+                self.logger.warning(f"Live counters: error vigilando cambios, reintentando: {e}")
+                time.sleep(POLL_INTERVAL)
+            except Exception as e:
+                self.logger.error(f"Live counters: error inesperado: {e}")
+                time.sleep(POLL_INTERVAL)
+
+    def _watch_changes(self):
+        """Recalcula al recibir eventos de change streams, agrupados por DEBOUNCE_SECONDS"""
+        pipeline = [{"$match": {"ns.coll": {"$in": self.watched}}}]
+        with self.service.db_conn.db.watch(pipeline, max_await_time_ms=1000) as stream:
+            self.logger.info("Live counters: usando change streams")
+            pending, first_change = set(), None
+            while self._active():
+                change = stream.try_next()
+                if change is not None:
+                    pending.add(change["ns"]["coll"])
+                    first_change = first_change or time.monotonic()
+                if pending and (change is None or time.monotonic() - first_change >= DEBOUNCE_SECONDS):
+                    self._refresh(pending)
+                    pending, first_change = set(), None
+
+    def _poll(self):
+        """Revisa las versiones de las colecciones y recalcula solo si cambiaron"""
+        self.logger.info("Live counters: sin replica set, usando poller compartido")
+        versions = self.service.get_collection_versions(self.form_collections)
+        while self._active():
+            time.sleep(POLL_INTERVAL)
+            current = self.service.get_collection_versions(self.form_collections)
+            if current != versions:
+                # Los contadores de un formulario nuevo cambian con él
+                self._refresh(self.watched)
+                versions = current
@@ -0,0 +1,222 @@
+from datetime import date, datetime, timedelta
+from pymongo import UpdateOne
+from services.executor import fan_out
+
+# Colección con los agregados semanales y mensuales de los contadores diarios
+ROLLUP_COLLECTION = 'RegistrosRollup'
+
+class Rollups:
+    """Agregados semanales y mensuales materializados de los *Counters.
+
+    Cada documento es {_id: "<contador>:<periodo>:<inicio>", coleccion, periodo,
+    inicio, seq} con periodo "semana" (inicio = lunes, %y%m%d) o "mes"
+    (inicio = primer día del mes). Solo se materializan periodos cerrados: el
+    periodo en curso siempre se lee de los contadores diarios porque los
+    formularios nuevos llegan por otros servicios que no actualizan el rollup.
+    Los periodos cerrados solo cambian por los borrados de esta API, que los
+    ajustan con adjust().
+    """
+
+    def __init__(self, db_conn, fetch_daily_counts):
+        self.db_conn = db_conn
+        # fetch_daily_counts(coleccion, inicio, fin, session=None) -> {"%y%m%d": seq}
+        self.fetch_daily_counts = fetch_daily_counts
+
+    @property
+    def collection(self):
+        return self.db_conn.db[ROLLUP_COLLECTION]
+
+    @staticmethod
+    def week_start(day):
+        """Lunes de la semana de day"""
+        return day - timedelta(days=day.weekday())
+
+    @staticmethod
+    def month_start(day):
+        """Primer día del mes de day"""
+        return day.replace(day=1)
+
+    @staticmethod
+    def _next_month(day):
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+    @staticmethod
+    def rollup_id(counter_collection, periodo, inicio):
+        return f"{counter_collection}:{periodo}:{inicio.strftime('%y%m%d')}"
+
+    def _as_datetime(self, day):
+        return datetime(day.year, day.month, day.day)
+
+    def stored_weekly(self, counter_collections, week_starts):
+        """Regresa {rollup_id: seq} de las semanas cerradas ya materializadas"""
+        today = date.today()
+        ids = [
+            self.rollup_id(collection, "semana", week)
+            for collection in counter_collections
+            for week in week_starts
+            if week + timedelta(days=7) <= today
+        ]
+        if not ids:
+            return {}
+        return {
+            record["_id"]: record.get("seq", 0)
+            for record in self.collection.find({"_id": {"$in": ids}}, {"seq": 1})
+        }
+
+    def weekly_totals(self, counter_collections, week_starts, known_daily=None, stored=None):
+        """Regresa {coleccion: {lunes: total}} para las semanas pedidas.
+
+        Las semanas cerradas se leen de la colección de rollups con una sola
+        consulta; las que aún no existen se calculan de los contadores diarios
+        y se materializan. La semana en curso se suma de los diarios. Los
+        diarios de cada colección se leen en paralelo; una colección que falla
+        se omite del resultado. known_daily = (inicio, fin, {coleccion: {"%y%m%d":
+        seq}}) son diarios ya leídos que se usan para las semanas que cubren y
+        stored es el resultado de stored_weekly si ya se leyó.
+        """
+        today = date.today()
+        if stored is None:
+            stored = self.stored_weekly(counter_collections, week_starts)
+
+        totals = {collection: {} for collection in counter_collections}
+        pending = {collection: [] for collection in counter_collections}
+        for collection in counter_collections:
+            for week in week_starts:
+                rollup_id = self.rollup_id(collection, "semana", week)
+                if rollup_id in stored:
+                    totals[collection][week] = stored[rollup_id]
+                else:
+                    pending[collection].append(week)
+
+        pending = {collection: weeks for collection, weeks in pending.items() if weeks}
+        known_start, known_end, known_counts = known_daily or (None, None, {})
+        known = {
+            collection: known_counts[collection]
+            for collection, weeks in pending.items()
+            if collection in known_counts and all(
+                known_start <= week and min(week + timedelta(days=6), today) <= known_end for week in weeks
+            )
+        }
+        daily_by_collection, errors = fan_out(
+            lambda collection: self.fetch_daily_counts(
+                collection,
+                self._as_datetime(min(pending[collection])),
+                self._as_datetime(max(pending[collection]) + timedelta(days=6))
+            ),
+            [collection for collection in pending if collection not in known]
+        )
+        daily_by_collection.update(known)
+        for collection in errors:
+            del totals[collection]
+
+        operations = []
+        for collection, daily in daily_by_collection.items():
+            for week in pending[collection]:
+                total = sum(
+                    daily.get((week + timedelta(days=offset)).strftime("%y%m%d"), 0)
+                    for offset in range(7)
+                )
+                totals[collection][week] = total
+                if week + timedelta(days=7) <= today:
+                    operations.append(self._materialize(collection, "semana", week, total, insert_only=True))
+
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+        return totals
+
+    def _materialize(self, counter_collection, periodo, inicio, total, insert_only=False):
+        """Operación de upsert del rollup; insert_only no pisa un documento existente"""
+        fields = {
+            "coleccion": counter_collection,
+            "periodo": periodo,
+            "inicio": inicio.strftime("%y%m%d"),
+            "seq": total
+        }
+        return UpdateOne(
+            {"_id": self.rollup_id(counter_collection, periodo, inicio)},
+            {"$setOnInsert" if insert_only else "$set": fields},
+            upsert=True
+        )
+
+    def adjust(self, counter_collection, day_id, delta, session=None):
+        """Ajusta en delta la semana y el mes del día day_id (%y%m%d)"""
+        self.adjust_many(counter_collection, {day_id: delta}, session=session)
+
+    def adjust_many(self, counter_collection, deltas, session=None):
+        """Aplica {día %y%m%d: delta} agrupado en un $inc por semana y por mes"""
+        grouped = {}
+        weeks = {}
+        for day_id, delta in deltas.items():
+            try:
+                day = datetime.strptime(day_id, "%y%m%d").date()
+            except ValueError:
+                # noFormato sin prefijo de fecha: no pertenece a ningún periodo
+                continue
+            week_id = self.rollup_id(counter_collection, "semana", self.week_start(day))
+            weeks[week_id] = self.week_start(day)
+            for rollup_id in (week_id, self.rollup_id(counter_collection, "mes", self.month_start(day))):
+                grouped[rollup_id] = grouped.get(rollup_id, 0) + delta
+        if not grouped:
+            return
+
+        existing = {
+            record["_id"]
+            for record in self.collection.find({"_id": {"$in": list(grouped)}}, {"_id": 1}, session=session)
+        }
+        today = date.today()
+        operations = []
+        for rollup_id, delta in grouped.items():
+            if rollup_id in existing:
+                if delta:
+                    operations.append(UpdateOne({"_id": rollup_id}, {"$inc": {"seq": delta}}))
+            elif rollup_id in weeks and weeks[rollup_id] + timedelta(days=7) <= today:
+                # Una semana cerrada sin rollup se materializa ya desde los diarios,
+                # que incluyen este cambio: si weekly_totals la está materializando
+                # con lo que leyó antes, su $setOnInsert ya no pisa este total
+                week = weeks[rollup_id]
+                daily = self.fetch_daily_counts(
+                    counter_collection,
+                    self._as_datetime(week),
+                    self._as_datetime(week + timedelta(days=6)),
+                    session=session
+                )
+                total = sum(daily.get((week + timedelta(days=offset)).strftime("%y%m%d"), 0) for offset in range(7))
+                operations.append(self._materialize(counter_collection, "semana", week, total))
+            # Los meses sin rollup solo los crea rebuild, que los lee de los diarios
+
+        if operations:
+            self.collection.bulk_write(operations, ordered=False, session=session)
+
+    def rebuild(self, counter_collections, start_date, end_date):
+        """Recalcula desde los diarios todos los periodos cerrados entre
+        start_date y end_date. Regresa el número de documentos escritos."""
+        today = date.today()
+        first = self.month_start(min(self.week_start(start_date), self.month_start(start_date)))
+        written = 0
+        for collection in counter_collections:
+            daily = self.fetch_daily_counts(collection, self._as_datetime(first), self._as_datetime(end_date))
+            operations = []
+
+            week = self.week_start(start_date)
+            while week + timedelta(days=7) <= min(today, end_date + timedelta(days=1)):
+                total = sum(
+                    daily.get((week + timedelta(days=offset)).strftime("%y%m%d"), 0)
+                    for offset in range(7)
+                )
+                operations.append(self._materialize(collection, "semana", week, total))
+                week += timedelta(days=7)
+
+            month = self.month_start(start_date)
+            while self._next_month(month) <= min(today, end_date + timedelta(days=1)):
+                total = 0
+                day = month
+                while day < self._next_month(month):
+                    total += daily.get(day.strftime("%y%m%d"), 0)
+                    day += timedelta(days=1)
+                operations.append(self._materialize(collection, "mes", month, total))
+                month = self._next_month(month)
+
+            if operations:
+                self.collection.bulk_write(operations, ordered=False)
+                written += len(operations)
+        return written
@@ -1,5 +1,154 @@
-from datetime import datetime, timedelta
+import base64
+import hashlib
+import itertools
+import json
+import os
+import re
+import unicodedata
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.collation import Collation
+from pymongo.errors import BulkWriteError, OperationFailure
 from logger.logger import Logger
+from models.health import ReadinessChecker
+from services.cache import TTLCache
+from services.executor import fan_out
+from services.rollup import Rollups
+
+# Colecciones de formularios del dashboard
+FORM_COLLECTIONS = ['vpnMayo', 'internet', 'rfc', 'tel']
+
+# Tipo de formulario -> (colección, colección de contadores diarios)
+FORM_TYPES = {
+    "rfc": ("rfc", "rfcCounters"),
+    "vpn": ("vpnMayo", "vpnMayoCounters"),
+    "tel": ("tel", "telCounters"),
+    "inter": ("internet", "internetCounters")
+}
+
+# Colección con el contador de cambios por colección que alimenta los ETags
+VERSIONS_COLLECTION = 'Versiones'
+
+# Tamaño máximo de página para los listados paginados
+MAX_PAGE_SIZE = 1000
+
+# Registros borrados por esta API que alimentan la sincronización incremental
+# de los listados. Se conservan TOMBSTONE_RETENCION_DIAS días (índice TTL);
+# un cursor más viejo que eso obliga al cliente a recargar la lista completa.
+TOMBSTONE_COLLECTION = 'Eliminados'
+TOMBSTONE_RETENTION_DAYS = int(os.environ.get("TOMBSTONE_RETENCION_DIAS", 30))
+
+# Prefijo de los tokens de cambios emitidos por el servidor y segundos que
+# se traslapan entre consultas para no perder borrados de relojes desfasados
+SYNC_TOKEN_PREFIX = "v1."
+SYNC_OVERLAP_SECONDS = 5
+
+# Proyecciones de los resúmenes del dashboard; su orden es también el orden
+# de columnas de las exportaciones
+RESUMEN_PROJECTIONS = {
+    "vpn": {
+        "_id": 1,
+        "nombreEnlace": 1,
+        "telefonoEnlace": 1,
+        "nombreAutoriza": 1,
+        "puestoAutoriza": 1
+    },
+    "inter": {
+        "_id": 1,
+        "nombreUsuario": 1,
+        "correoUsuario": 1,
+        "ipUsuario": 1,
+        "nombreJefe": 1
+    },
+    "tel": {
+        "_id": 1,
+        "nombreUsuario": 1,
+        "correoUsuario": 1,
+        "movimiento": 1,
+        "nombreJefe": 1
+    },
+    "rfc": {
+        "_id": 1,
+        "noticket": 1,
+        "memo": 1,
+        "descbreve": 1,
+        "nombreJefe": 1
+    }
+}
+
+# Campos de búsqueda por tipo en orden de relevancia; todos están en la
+# proyección del resumen del tipo
+SEARCH_FIELDS = {
+    "vpn": ["nombreEnlace", "nombreAutoriza"],
+    "inter": ["nombreUsuario", "correoUsuario", "nombreJefe"],
+    "tel": ["nombreUsuario", "correoUsuario", "nombreJefe"],
+    "rfc": ["noticket", "nombreJefe"]
+}
+
+# Comparación en español que ignora mayúsculas y acentos; los índices de
+# búsqueda se crean con la misma collation para que las consultas los usen
+SEARCH_COLLATION = Collation(locale="es", strength=1)
+SEARCH_MIN_LENGTH = 2
+SEARCH_MAX_RESULTS = 200
+
+# Colecciones ya filtradas que se descargan desde los endpoints *Filtrado
+FILTRO_COLLECTIONS = {
+    "rfc": "PruebaIP2",
+    "tel": "PruebaTel",
+    "vpn": "PruebaVPN",
+    "inter": "PruebaInter"
+}
+
+# Documentos por lote al recorrer los cursores de descarga
+FILTRO_BATCH_SIZE = 500
+
+# Con FILTRO_RAW_BSON=1 las descargas leen RawBSONDocument: los documentos se
+# guardan como bytes y solo se decodifican al serializarlos
+FILTRO_RAW_BSON = os.environ.get("FILTRO_RAW_BSON", "0") == "1"
+
+# Formularios máximos por petición de ingesta en lote
+INGEST_MAX_ITEMS = int(os.environ.get("INGESTA_MAX_FORMULARIOS", 5000))
+
+# Bitácora de errores de los otros servicios. Con ERRORES_RETENCION_DIAS se
+# crea un índice TTL sobre Fecha que acota su tamaño; los días del resumen
+# se agrupan en ERRORES_ZONA_HORARIA.
+ERRORES_COLLECTION = 'Errores'
+ERRORES_RETENTION_DAYS = int(os.environ.get("ERRORES_RETENCION_DIAS", 0))
+ERRORES_TIMEZONE = os.environ.get("ERRORES_ZONA_HORARIA", "UTC")
+
+# Operadores aceptados en las especificaciones de filtro
+FILTRO_OPERATORS = {
+    "gte": "$gte",
+    "gt": "$gt",
+    "lte": "$lte",
+    "lt": "$lt",
+    "prefix": "$regex"
+}
+FILTRO_SCALAR_TYPES = (str, int, float, bool)
+
+# Segundos de vida en caché de cada agregado del dashboard. Se pueden ajustar
+# con CACHE_TTL_<NOMBRE>, p. ej. CACHE_TTL_FORM_COUNTS=10; 0 desactiva la caché.
+CACHE_TTLS = {
+    "form-counts": 30,
+    "counter-series": 30,
+    "weekly-stats": 60,
+    # Versiones de colección de los ETags de los listados: evita repetir
+    # sus 1 + 2n consultas en cada petición a costa de unos segundos de retraso
+    "collection-versions": 2
+}
+
+# Secciones de /api2/v1/dashboard
+DASHBOARD_SECTIONS = ["form-counts", "weekly-registrations", "old-weekly-registrations", "weekly-stats"]
+
+# Contadores diarios de los formularios que alimentan las gráficas semanales
+COUNTER_COLLECTIONS = ['vpnMayoCounters', 'internetCounters', 'rfcCounters', 'telCounters']
+
+class SyncTokenExpired(ValueError):
+    """El cursor de cambios es más viejo que la retención de los borrados"""
 
 class Service:
     """Service class to that implements the logic of the CRUD operations for tickets"""
@@ -8,27 +157,228 @@ class Service:
         self.logger = Logger()
         self.db_conn = db_conn
 
-    def get_analytics_data(self):
-        """Function to get counts for all form types for the dashboard"""
+        # Campos filtrables por tipo, p. ej. FILTRO_CAMPOS_RFC="estado,fecha".
+        # Si un tipo no tiene lista se puede filtrar por cualquier campo que no
+        # sea un operador, pero no ordenar: solo estos campos tienen índice.
+        self.filtro_fields = {}
+        for tipo in FILTRO_COLLECTIONS:
+            value = os.environ.get(f"FILTRO_CAMPOS_{tipo.upper()}", "")
+            allowed = [field.strip() for field in value.split(",") if field.strip()]
+            if allowed:
+                self.filtro_fields[tipo] = allowed
+
+        self.rollups = Rollups(db_conn, self.get_daily_registration_counts)
+
+        self.readiness = ReadinessChecker(db_conn)
+
+        self.cache = TTLCache(max_size=int(os.environ.get("CACHE_MAX_SIZE", 256)))
+        self.cache_ttls = {
+            name: int(os.environ.get(f"CACHE_TTL_{name.upper().replace('-', '_')}", ttl))
+            for name, ttl in CACHE_TTLS.items()
+        }
+
+    def get_analytics_data(self, exact=False):
+        """Function to get counts for all form types for the dashboard.
+
+        By default the counts come from the collection metadata
+        (estimated_document_count), which is constant time. exact=True runs
+        count_documents({}) instead, for audits. The collections are queried
+        concurrently; a collection that fails or times out reports None.
+        """
         try:
-            collections = ['vpnMayo', 'internet', 'rfc', 'tel']
-            analytics_data = []
-            
-            for collection in collections:
-                count = self.db_conn.db[collection].count_documents({})
-                label = collection.title()
-                
-                analytics_data.append({
-                    "label": label,
-                    "value": count
-                })
-            
-            return analytics_data, 200
-            
+            hit, cached = self._cached_form_counts(exact)
+            if hit:
+                return cached, 200
+
+            counts, errors = fan_out(lambda collection: self._count_form(collection, exact), FORM_COLLECTIONS)
+            return self._store_form_counts(exact, counts, errors), 200
+
         except Exception as e:
             self.logger.error(f"Error fetching analytics data: {e}")
             return {"error": f"Error fetching analytics data: {e}"}, 500
         
+    def _count_form(self, collection, exact=False):
+        if exact:
+            return self.db_conn.db[collection].count_documents({})
+        return self.db_conn.db[collection].estimated_document_count()
+
+    def _form_counts_key(self, exact):
+        return ("form-counts", exact)
+
+    def _cached_form_counts(self, exact=False):
+        """(hit, form-counts) de la caché"""
+        return self.cache.get(self._form_counts_key(exact))
+
+    def _store_form_counts(self, exact, counts, errors):
+        """Da formato a los conteos y los guarda en caché si ninguna colección falló"""
+        analytics_data = self._format_analytics(FORM_COLLECTIONS, counts)
+        if not errors:
+            self.cache.set(self._form_counts_key(exact), analytics_data, self.cache_ttls["form-counts"], FORM_COLLECTIONS)
+        return analytics_data
+
+    def _format_analytics(self, collections, counts):
+        """Conteos por colección en el formato de form-counts"""
+        analytics_data = []
+        
+        for collection in collections:
+            label = collection.title()
+            
+            analytics_data.append({
+                "label": label,
+                "value": counts.get(collection)
+            })
+        return analytics_data
+
+    def get_dashboard(self, sections):
+        """Calcula en un solo fan-out las secciones pedidas del dashboard"""
+        try:
+            today = datetime.now()
+            current_monday = today - timedelta(days=today.weekday())
+            previous_monday = current_monday - timedelta(weeks=1)
+            # Los diarios del lunes pasado al domingo de esta semana alimentan las
+            # gráficas semanales (counter-series) y la semana en curso de weekly-stats
+            end_date = current_monday + timedelta(days=6)
+            dashboard = {}
+
+            tasks = []
+            if "form-counts" in sections:
+                hit, cached = self._cached_form_counts()
+                if hit:
+                    dashboard["form-counts"] = cached
+                else:
+                    tasks += [("count", collection) for collection in FORM_COLLECTIONS]
+
+            need_daily = any(section in sections for section in DASHBOARD_SECTIONS[1:])
+            series = None
+            if need_daily:
+                hit, series = self._cached_counter_series(COUNTER_COLLECTIONS, previous_monday, end_date)
+                if not hit:
+                    series = None
+                    tasks += [("daily", collection) for collection in COUNTER_COLLECTIONS]
+
+            # Las semanas cerradas de las estadísticas se leen junto con lo demás
+            if "weekly-stats" in sections:
+                stats_start, stats_end = self._weekly_stats_range()
+                hit, cached = self._cached_weekly_stats(stats_end)
+                if hit:
+                    dashboard["weekly-stats"] = cached
+                else:
+                    week_starts = self._week_starts(stats_start, stats_end)
+                    tasks.append(("rollups", None))
+
+            def run(task):
+                kind, collection = task
+                if kind == "count":
+                    return self._count_form(collection)
+                if kind == "rollups":
+                    return self.rollups.stored_weekly(COUNTER_COLLECTIONS, week_starts)
+                return self.get_daily_registration_counts(collection, previous_monday, end_date)
+
+            results, errors = fan_out(run, tasks)
+
+            if "form-counts" in sections and "form-counts" not in dashboard:
+                counts = {collection: value for (kind, collection), value in results.items() if kind == "count"}
+                count_errors = [collection for kind, collection in errors if kind == "count"]
+                dashboard["form-counts"] = self._store_form_counts(False, counts, count_errors)
+
+            if need_daily:
+                if series is None:
+                    daily_counts = {
+                        collection: value for (kind, collection), value in results.items() if kind == "daily"
+                    }
+                    daily_errors = [collection for kind, collection in errors if kind == "daily"]
+                    series = self._store_counter_series(
+                        COUNTER_COLLECTIONS, previous_monday, end_date, daily_counts, daily_errors
+                    )
+                else:
+                    daily_counts = {
+                        collection: {
+                            day["date"].strftime("%y%m%d"): day["counts"][collection] for day in series
+                        }
+                        for collection in COUNTER_COLLECTIONS
+                        if all(day["counts"][collection] is not None for day in series)
+                    }
+                dashboard["counter-series"] = series
+
+                if "weekly-stats" in sections and "weekly-stats" not in dashboard:
+                    known_daily = (previous_monday.date(), end_date.date(), daily_counts)
+                    # Si la lectura de rollups falló weekly_totals la repite
+                    stored = results.get(("rollups", None))
+                    weekly_stats, status_code = self.get_weekly_registration_stats(known_daily, stored)
+                    if status_code != 200:
+                        return weekly_stats, status_code
+                    dashboard["weekly-stats"] = weekly_stats
+
+            return dashboard, 200
+        except Exception as e:
+            self.logger.error(f"Error getting dashboard: {e}")
+            return {"error": f"Error getting dashboard: {e}"}, 500
+
+    def get_pool_stats(self):
+        """Regresa las estadísticas del pool de conexiones de Mongo del worker"""
+        return self.db_conn.pool_stats(), 200
+
+    def get_readiness(self):
+        """Estado de readiness del worker ya calculado por el hilo de verificación"""
+        readiness, ready = self.readiness.status()
+        return readiness, 200 if ready else 503
+
+    def get_cache_stats(self):
+        """Regresa los contadores de aciertos y fallos de la caché de agregados"""
+        return {**self.cache.stats(), "ttls": self.cache_ttls}, 200
+
+    def get_collection_versions(self, collection_names):
+        """Regresa una versión barata de cada colección sin recorrerla.
+
+        La versión combina el _id máximo (índice de _id), el conteo de metadatos
+        y el contador de cambios que se incrementa en cada borrado. Se guarda
+        en caché CACHE_TTL_COLLECTION_VERSIONS segundos; los borrados de este
+        worker la invalidan de inmediato.
+        """
+        cache_key = ("collection-versions", tuple(sorted(collection_names)))
+        hit, cached = self.cache.get(cache_key)
+        if hit:
+            return cached
+
+        counters = {
+            record["_id"]: record.get("version", 0)
+            for record in self.db_conn.db[VERSIONS_COLLECTION].find({"_id": {"$in": list(collection_names)}})
+        }
+
+        def version(collection_name):
+            collection = self.db_conn.db[collection_name]
+            last = collection.find_one({}, {"_id": 1}, sort=[("_id", DESCENDING)])
+            return (
+                last["_id"] if last else None,
+                collection.estimated_document_count(),
+                counters.get(collection_name, 0)
+            )
+
+        versions, errors = fan_out(version, collection_names)
+        if errors:
+            # Sin versión no se puede garantizar un ETag correcto
+            raise next(iter(errors.values()))
+        self.cache.set(cache_key, versions, self.cache_ttls["collection-versions"], collection_names)
+        return versions
+
+    def get_etag(self, collection_names, *extra):
+        """ETag fuerte derivado de las versiones de las colecciones y de extra
+        (ruta, parámetros, fecha) que también determinan la respuesta."""
+        versions = self.get_collection_versions(collection_names)
+        material = repr((sorted(versions.items()), extra)).encode()
+        return hashlib.sha256(material).hexdigest()[:32]
+
+    def get_payload_etag(self, payload, *extra):
+        """ETag fuerte derivado del cuerpo de la respuesta y de extra"""
+        material = repr((payload, extra)).encode()
+        return hashlib.sha256(material).hexdigest()[:32]
+
+    def _bump_version(self, collection_name, session=None):
+        """Incrementa el contador de cambios de una colección"""
+        self.db_conn.db[VERSIONS_COLLECTION].update_one(
+            {"_id": collection_name}, {"$inc": {"version": 1}}, upsert=True, session=session
+        )
+
     def get_daily_registration_count(self, collection_name, formatted_date):
         """Function to get the registration count for a specific collection and date."""
         try:
@@ -39,10 +389,14 @@ class Service:
             self.logger.error(f"Error querying {collection_name} for {formatted_date}: {e}")
             return None
 
-    def get_weekly_registration_stats(self):
-        """Obtiene estadísticas semanales de registros con porcentajes de cambio"""
+    def get_weekly_registration_stats(self, known_daily=None, stored_rollups=None):
+        """Obtiene estadísticas semanales de registros con porcentajes de cambio.
+
+        known_daily y stored_rollups son contadores diarios y rollups ya leídos
+        (ver Rollups.weekly_totals).
+        """
         try:
-            collections = ['vpnMayoCounters', 'internetCounters', 'rfcCounters', 'telCounters']
+            collections = COUNTER_COLLECTIONS
             label_mapping = {
                 'vpnMayoCounters': 'vpn',
                 'internetCounters': 'internet',
@@ -50,59 +404,155 @@ class Service:
                 'telCounters': 'telefonia'
             }
             
-            end_date = datetime.now()
-            start_date = end_date - timedelta(weeks=6)
+            start_date, end_date = self._weekly_stats_range()
+
+            hit, cached = self._cached_weekly_stats(end_date)
+            if hit:
+                return cached, 200
             
             results = {}
+
+            # Obtener conteos por semana de los rollups materializados
+            weekly_counts_by_collection = self._get_weekly_counts(
+                collections, start_date, end_date, known_daily, stored_rollups
+            )
             
             for collection in collections:
-                # Obtener conteos por semana
-                weekly_counts = self._get_weekly_counts_from_daily(collection, start_date, end_date)
+                weekly_counts = weekly_counts_by_collection[collection]
                 
-                # Calcular porcentajes de cambio
-                stats_with_change = self._calculate_weekly_changes(weekly_counts)
+                # Calcular porcentajes de cambio (None si la colección falló)
+                stats_with_change = self._calculate_weekly_changes(weekly_counts) if weekly_counts is not None else None
                 
                 # Formatear nombre para el frontend
                 formatted_name = label_mapping.get(collection, collection)
                 results[formatted_name] = stats_with_change
             
+            if None not in results.values():
+                self.cache.set(self._weekly_stats_key(end_date), results, self.cache_ttls["weekly-stats"], collections)
             return results, 200
             
         except Exception as e:
             self.logger.error(f"Error getting weekly registration stats: {e}")
             return {"error": f"Error getting weekly registration stats: {e}"}, 500
     
-    def _get_weekly_counts_from_daily(self, collection_name, start_date, end_date):
-        """Obtiene conteos semanales sumando los registros diarios"""
-        weekly_counts = []
-        
-        # Generar todas las semanas en el rango
-        current_week_start = start_date - timedelta(days=start_date.weekday())
-        
-        while current_week_start <= end_date:
-            week_end = current_week_start + timedelta(days=6)
-            week_total = 0
-            
-            # Sumar registros para cada día de la semana
-            for day in range(7):
-                current_date = current_week_start + timedelta(days=day)
-                formatted_date = current_date.strftime("%y%m%d")
-                
-                record = self.get_daily_registration_count(collection_name, formatted_date)
-                week_total += record['seq'] if record else 0
-            
-            # Agregar datos de la semana
-            week_str = current_week_start.strftime("Semana #%U")
-            weekly_counts.append({
-                "week": week_str,
-                "count": week_total
+    def _weekly_stats_range(self):
+        """Rango (inicio, fin) de las estadísticas semanales: las últimas 6 semanas"""
+        end_date = datetime.now()
+        return end_date - timedelta(weeks=6), end_date
+
+    def _weekly_stats_key(self, end_date):
+        return ("weekly-stats", end_date.date())
+
+    def _cached_weekly_stats(self, end_date):
+        """(hit, weekly-stats) de la caché"""
+        return self.cache.get(self._weekly_stats_key(end_date))
+
+    def get_daily_registration_counts(self, collection_name, start_date, end_date, session=None):
+        """Obtiene los conteos diarios de un rango de fechas con una sola consulta.
+
+        Los documentos de los contadores usan como _id la fecha en formato
+        %y%m%d, por lo que el rango se resuelve sobre el índice de _id.
+        Regresa un diccionario {fecha_formateada: seq}.
+        """
+        collection = self.db_conn.db[collection_name]
+        query = {
+            "_id": {
+                "$gte": start_date.strftime("%y%m%d"),
+                "$lte": end_date.strftime("%y%m%d")
+            }
+        }
+        return {
+            record["_id"]: record.get("seq", 0)
+            for record in collection.find(query, {"_id": 1, "seq": 1}, session=session)
+        }
+
+    def get_counter_series(self, collections, start_date, end_date):
+        """Regresa la matriz densa día x colección de los contadores diarios.
+
+        Se hace una sola consulta por colección y los días sin documento se
+        rellenan con 0. Cada elemento es {"date": datetime, "counts": {coleccion: seq}}.
+        Las colecciones se consultan en paralelo; si una falla sus conteos son None.
+        """
+        hit, cached = self._cached_counter_series(collections, start_date, end_date)
+        if hit:
+            return cached
+
+        daily_counts, errors = fan_out(
+            lambda collection: self.get_daily_registration_counts(collection, start_date, end_date),
+            collections
+        )
+        return self._store_counter_series(collections, start_date, end_date, daily_counts, errors)
+
+    def _counter_series_key(self, collections, start_date, end_date):
+        return ("counter-series", tuple(collections), start_date.date(), end_date.date())
+
+    def _cached_counter_series(self, collections, start_date, end_date):
+        """(hit, serie) de la caché"""
+        return self.cache.get(self._counter_series_key(collections, start_date, end_date))
+
+    def _store_counter_series(self, collections, start_date, end_date, daily_counts, errors):
+        """Arma la serie y la guarda en caché si ninguna colección falló"""
+        series = self._build_counter_series(collections, start_date, end_date, daily_counts)
+        if not errors:
+            self.cache.set(
+                self._counter_series_key(collections, start_date, end_date),
+                series, self.cache_ttls["counter-series"], collections
+            )
+        return series
+
+    def _build_counter_series(self, collections, start_date, end_date, daily_counts):
+        """Rellena con 0 los días sin documento; None para las colecciones sin datos"""
+        series = []
+        current_date = start_date
+        while current_date.date() <= end_date.date():
+            formatted_date = current_date.strftime("%y%m%d")
+            series.append({
+                "date": current_date,
+                "counts": {
+                    collection: daily_counts[collection].get(formatted_date, 0) if collection in daily_counts else None
+                    for collection in collections
+                }
             })
-            
-            # Mover a la siguiente semana
+            current_date += timedelta(days=1)
+        return series
+
+    def _week_starts(self, start_date, end_date):
+        """Lunes de cada semana entre start_date y end_date"""
+        week_starts = []
+        current_week_start = (start_date - timedelta(days=start_date.weekday())).date()
+        while current_week_start <= end_date.date():
+            week_starts.append(current_week_start)
             current_week_start += timedelta(weeks=1)
-        
-        return weekly_counts
-    
+        return week_starts
+
+    def _get_weekly_counts(self, collections, start_date, end_date, known_daily=None, stored_rollups=None):
+        """Obtiene conteos semanales de cada colección a partir de los rollups.
+
+        Las semanas cerradas salen de la colección de rollups y solo la semana
+        en curso se suma de los contadores diarios.
+        """
+        week_starts = self._week_starts(start_date, end_date)
+        totals = self.rollups.weekly_totals(collections, week_starts, known_daily, stored_rollups)
+
+        return {
+            collection: [
+                {
+                    "week": week_start.strftime("Semana #%U"),
+                    "count": totals[collection][week_start]
+                }
+                for week_start in week_starts
+            ] if collection in totals else None
+            for collection in collections
+        }
+
+    def reconstruir_rollups(self, start_date, end_date):
+        """Recalcula los rollups semanales y mensuales cerrados entre dos fechas"""
+        collections = ['vpnMayoCounters', 'internetCounters', 'rfcCounters', 'telCounters']
+        written = self.rollups.rebuild(collections, start_date, end_date)
+        for collection in collections:
+            self.cache.invalidate(collection)
+        return written
+
     def _calculate_weekly_changes(self, weekly_counts):
         """Calcula porcentajes de cambio semana a semana"""
         if len(weekly_counts) < 2:
@@ -134,7 +584,140 @@ class Service:
         # Devolver solo las últimas 6 semanas
         return sorted_counts[-6:]
 
-    def VPN_Registros_Resumen(self):
+    def _consultar_resumen(self, collection, projection, limit=None, after=None, fields=None, with_total=False,
+                           since=None):
+        """Consulta un resumen con paginación por llave (_id) y selección de campos.
+
+        Sin limit se conserva el comportamiento original y se regresa la lista
+        completa. Con limit se regresa una página ordenada por _id
+        {"registros": [...], "siguiente": ultimo_id} y, si se pide, el "total".
+        Con since se regresan solo los cambios (ver _consultar_cambios).
+        """
+        if fields:
+            unknown = [field for field in fields if field not in projection]
+            if unknown:
+                raise ValueError(f"Campos no permitidos: {', '.join(unknown)}")
+            projection = {field: 1 for field in fields}
+            projection["_id"] = 1
+
+        if since is not None:
+            return self._consultar_cambios(collection, projection, since, limit)
+
+        if limit is None:
+            return list(collection.find({}, projection))
+
+        if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+            raise ValueError("limit debe ser un entero positivo")
+        limit = min(limit, MAX_PAGE_SIZE)
+
+        query = {"_id": {"$gt": after}} if after is not None else {}
+        registros = list(collection.find(query, projection).sort("_id", 1).limit(limit))
+
+        page = {
+            "registros": registros,
+            "siguiente": registros[-1]["_id"] if len(registros) == limit else None
+        }
+        if with_total:
+            page["total"] = collection.count_documents({})
+        return page
+
+    def _sync_token(self, collection_name, last_id, since_time):
+        """Token de cambios: colección, último _id entregado y hora de los borrados"""
+        payload = json.dumps({"c": collection_name, "id": last_id, "t": since_time.timestamp()})
+        return SYNC_TOKEN_PREFIX + base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def _leer_cursor_cambios(self, collection_name, since):
+        """Regresa (último _id, hora desde la que se buscan borrados) de since.
+
+        since puede ser un token emitido por el servidor, el último noFormato
+        que tiene el cliente (los borrados se buscan desde el inicio del día
+        de su prefijo) o "" para empezar desde cero.
+        """
+        if not isinstance(since, str):
+            raise ValueError("since debe ser un token de cambios o un noFormato")
+        if since == "":
+            return None, None
+
+        if since.startswith(SYNC_TOKEN_PREFIX):
+            try:
+                encoded = since[len(SYNC_TOKEN_PREFIX):]
+                payload = json.loads(base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+                last_id = payload["id"]
+                since_time = datetime.fromtimestamp(float(payload["t"]), timezone.utc)
+            except (ValueError, KeyError, TypeError, OverflowError, OSError):
+                raise ValueError("Token de cambios inválido")
+            if payload.get("c") != collection_name:
+                raise ValueError("El token de cambios pertenece a otro listado")
+        else:
+            try:
+                since_time = datetime.strptime(since[:6], "%y%m%d").replace(tzinfo=timezone.utc)
+            except ValueError:
+                raise ValueError("since debe ser un token de cambios o un noFormato con prefijo de fecha")
+            last_id = since
+
+        if since_time < datetime.now(timezone.utc) - timedelta(days=TOMBSTONE_RETENTION_DAYS):
+            raise SyncTokenExpired(
+                f"El cursor de cambios tiene más de {TOMBSTONE_RETENTION_DAYS} días; recarga la lista completa"
+            )
+        # Una ingesta con noFormato anteriores al cursor no se vería como cambio
+        version = self.db_conn.db[VERSIONS_COLLECTION].find_one({"_id": collection_name}, {"retroactivo": 1})
+        if version and since_time.timestamp() < version.get("retroactivo", 0):
+            raise SyncTokenExpired("Se ingresaron registros anteriores al cursor de cambios; recarga la lista completa")
+        return last_id, since_time
+
+    def _consultar_cambios(self, collection, projection, since, limit=None):
+        """Cambios de un listado desde el cursor since.
+
+        Regresa {"registros": insertados con _id mayor al cursor, "eliminados":
+        ids borrados por esta API desde el cursor, "token": cursor para la
+        siguiente consulta, "completo": False si quedan insertados por leer}.
+        Un id puede reportarse como eliminado más de una vez o sin que el
+        cliente lo tenga; el cliente solo debe quitarlo si existe.
+        """
+        if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 1):
+            raise ValueError("limit debe ser un entero positivo")
+        limit = min(limit or MAX_PAGE_SIZE, MAX_PAGE_SIZE)
+
+        last_id, since_time = self._leer_cursor_cambios(collection.name, since)
+        # Hora tomada antes de consultar: un borrado concurrente se repite en
+        # la siguiente consulta en lugar de perderse
+        now = datetime.now(timezone.utc) - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        registros = list(collection.find(query, projection).sort("_id", 1).limit(limit + 1))
+        completo = len(registros) <= limit
+        registros = registros[:limit]
+
+        eliminados = []
+        if since_time is not None:
+            eliminados = [
+                record["noFormato"] for record in self.db_conn.db[TOMBSTONE_COLLECTION].find(
+                    {"coleccion": collection.name, "eliminado": {"$gt": since_time}},
+                    {"_id": 0, "noFormato": 1}
+                )
+            ]
+
+        if registros:
+            last_id = registros[-1]["_id"]
+        # Mientras queden insertados por leer se conserva la hora de los borrados
+        next_time = now if completo else (since_time or now)
+        return {
+            "registros": registros,
+            "eliminados": list(dict.fromkeys(eliminados)),
+            "token": self._sync_token(collection.name, last_id, next_time),
+            "completo": completo
+        }
+
+    def _registrar_eliminados(self, collection_name, ids, session=None):
+        """Guarda las lápidas de los registros borrados para la sincronización incremental"""
+        eliminado = datetime.now(timezone.utc)
+        self.db_conn.db[TOMBSTONE_COLLECTION].insert_many(
+            [{"coleccion": collection_name, "noFormato": i, "eliminado": eliminado} for i in ids],
+            ordered=False,
+            session=session
+        )
+
+    def VPN_Registros_Resumen(self, limit=None, after=None, fields=None, with_total=False, since=None):
         """Te da un resumen de los registros VPN 2.0 para el Dashboard"""
         """
         Extrae _id, nombre, extension, correo y movimiento de todos los registros
@@ -145,20 +728,18 @@ class Service:
 
         try:
             vpn_collection = self.db_conn.db['vpnMayo']
-            projection = {
-                "_id": 1,
-                "nombreEnlace": 1,
-                "telefonoEnlace": 1,
-                "nombreAutoriza": 1,
-                "puestoAutoriza": 1
-            }
-            registros_vpn = list(vpn_collection.find({}, projection))
+            projection = RESUMEN_PROJECTIONS["vpn"]
+            registros_vpn = self._consultar_resumen(vpn_collection, projection, limit, after, fields, with_total, since)
             return registros_vpn, 200
+        except SyncTokenExpired as e:
+            return {"error": str(e), "recargar": True}, 410
+        except ValueError as e:
+            return {"error": str(e)}, 400
         except Exception as e:
             self.logger.error(f"Error al obtener datos de la colección 'vpnMayo': {e}")
             return {"error": "Error al obtener datos de VPN_Mayo"}, 500
         
-    def Internet_Registros_Resumen(self):
+    def Internet_Registros_Resumen(self, limit=None, after=None, fields=None, with_total=False, since=None):
         """Te da un resumen de los registros VPN para el Dashboard"""
         """
         Extrae _id, nombreUsuario, correoUsuario, ipUsuario de todos los registros
@@ -169,20 +750,18 @@ class Service:
 
         try:
             internet_collection = self.db_conn.db['internet']
-            projection = {
-                "_id": 1,
-                "nombreUsuario": 1,
-                "correoUsuario": 1,
-                "ipUsuario": 1,
-                "nombreJefe": 1
-            }
-            registros_internet = list(internet_collection.find({}, projection))
+            projection = RESUMEN_PROJECTIONS["inter"]
+            registros_internet = self._consultar_resumen(internet_collection, projection, limit, after, fields, with_total, since)
             return registros_internet, 200
+        except SyncTokenExpired as e:
+            return {"error": str(e), "recargar": True}, 410
+        except ValueError as e:
+            return {"error": str(e)}, 400
         except Exception as e:
             self.logger.error(f"Error al obtener datos de la colección 'internet': {e}")
             return {"error": "Error al obtener datos de Internet"}, 500
         
-    def Telefonia_Registros_Resumen(self):
+    def Telefonia_Registros_Resumen(self, limit=None, after=None, fields=None, with_total=False, since=None):
         """Te da un resumen de los registros VPN para el Dashboard"""
         """
         Extrae _id, nombreUsuario, correoUsuario, movimiento de todos los registros
@@ -193,20 +772,18 @@ class Service:
 
         try:
             telefonia_collection = self.db_conn.db['tel']
-            projection = {
-                "_id": 1,
-                "nombreUsuario": 1,
-                "correoUsuario": 1,
-                "movimiento": 1,
-                "nombreJefe": 1
-            }
-            registros_telefonia = list(telefonia_collection.find({}, projection))
+            projection = RESUMEN_PROJECTIONS["tel"]
+            registros_telefonia = self._consultar_resumen(telefonia_collection, projection, limit, after, fields, with_total, since)
             return registros_telefonia, 200
+        except SyncTokenExpired as e:
+            return {"error": str(e), "recargar": True}, 410
+        except ValueError as e:
+            return {"error": str(e)}, 400
         except Exception as e:
             self.logger.error(f"Error al obtener datos de la colección 'telefonia': {e}")
             return {"error": "Error al obtener datos de Telefonia"}, 500
         
-    def RFC_Registros_Resumen(self):
+    def RFC_Registros_Resumen(self, limit=None, after=None, fields=None, with_total=False, since=None):
         """Te da un resumen de los registros RFC para el Dashboard"""
         """
         Extrae _id, nombreUsuario, correoUsuario, movimiento de todos los registros
@@ -217,74 +794,312 @@ class Service:
 
         try:
             rfc_collection = self.db_conn.db['rfc']
-            projection = {
-                "_id": 1,
-                "noticket": 1,
-                "memo": 1,
-                "descbreve": 1,
-                "nombreJefe": 1
-            }
-            registros_rfc = list(rfc_collection.find({}, projection))
+            projection = RESUMEN_PROJECTIONS["rfc"]
+            registros_rfc = self._consultar_resumen(rfc_collection, projection, limit, after, fields, with_total, since)
             return registros_rfc, 200
+        except SyncTokenExpired as e:
+            return {"error": str(e), "recargar": True}, 410
+        except ValueError as e:
+            return {"error": str(e)}, 400
         except Exception as e:
             self.logger.error(f"Error al obtener datos de la colección 'telefonia': {e}")
             return {"error": "Error al obtener datos de Telefonia"}, 500
         
     # filepath: service.py
-    def RFC_Filtro(self):
+    def buscar_registros(self, texto, tipos=None, limit=20, offset=0):
+        """Busca formularios cuyo nombre, correo, jefe o ticket empiece con texto.
+
+        La comparación ignora mayúsculas y acentos. Los resultados se ordenan
+        por coincidencia exacta, luego por el orden de SEARCH_FIELDS, el orden
+        de tipos y al final en el orden del índice (valor y noFormato más reciente).
+        """
+        try:
+            texto = (texto or "").strip()
+            if len(texto) < SEARCH_MIN_LENGTH:
+                return {"error": f"La búsqueda requiere al menos {SEARCH_MIN_LENGTH} caracteres"}, 400
+            tipos = tipos or list(SEARCH_FIELDS)
+            unknown = [tipo for tipo in tipos if tipo not in SEARCH_FIELDS]
+            if unknown:
+                return {"error": f"Tipos de formulario desconocidos: {', '.join(unknown)}"}, 400
+            if limit < 1 or offset < 0 or offset + limit > SEARCH_MAX_RESULTS:
+                return {"error": f"limit y offset deben cubrir a lo más {SEARCH_MAX_RESULTS} resultados"}, 400
+
+            # Una fila de más por grupo indica si hay otra página
+            window = offset + limit + 1
+            normalized = self._normalizar_busqueda(texto)
+
+            def search(tipo):
+                """Regresa {_id: registro} y {(exacto, campo): [_id en orden del índice]}"""
+                collection = self.db_conn.db[FORM_TYPES[tipo][0]]
+                found, order = {}, {}
+                for field in SEARCH_FIELDS[tipo]:
+                    for exact, query in ((0, {field: texto}), (1, {field: {"$gte": texto, "$lt": texto + "\uffff"}})):
+                        # El orden de la consulta es el del ranking: las primeras
+                        # filas de cada grupo son las mejores de ese grupo
+                        cursor = collection.find(
+                            query, RESUMEN_PROJECTIONS[tipo], collation=SEARCH_COLLATION,
+                            sort=[(field, ASCENDING), ("_id", DESCENDING)], limit=window
+                        )
+                        order[(exact, field)] = []
+                        for record in cursor:
+                            found.setdefault(record["_id"], record)
+                            order[(exact, field)].append(record["_id"])
+                return found, order
+
+            results, errors = fan_out(search, tipos)
+            if errors and not results:
+                return {"error": "Error al buscar registros"}, 500
+
+            ranked = []
+            for tipo, (found, order) in results.items():
+                positions = {group: {_id: i for i, _id in enumerate(ids)} for group, ids in order.items()}
+                for _id, record in found.items():
+                    # El grupo de un registro es su mejor coincidencia, aunque lo
+                    # haya traído la consulta de otro campo
+                    rank = None
+                    for position, field in enumerate(SEARCH_FIELDS[tipo]):
+                        value = self._normalizar_busqueda(record.get(field))
+                        if value.startswith(normalized):
+                            candidate = (0 if value == normalized else 1, position, field)
+                            rank = min(rank, candidate) if rank else candidate
+                    if rank:
+                        # Fuera de la ventana de su grupo solo puede quedar después de ella
+                        index = positions[(rank[0], rank[2])].get(_id, window)
+                        ranked.append(((rank[0], rank[1], tipos.index(tipo), index), rank, tipo, record))
+
+            ranked.sort(key=lambda item: item[0])
+            ranked = [(rank, tipo, record) for _, rank, tipo, record in ranked]
+            page = ranked[offset:offset + limit]
+            return {
+                "resultados": [
+                    {"tipo": tipo, "campo": rank[2], "exacto": rank[0] == 0, "registro": record}
+                    for rank, tipo, record in page
+                ],
+                "siguiente": offset + limit if len(ranked) > offset + limit and offset + limit < SEARCH_MAX_RESULTS else None,
+                "incompletos": sorted(errors)
+            }, 200
+        except Exception as e:
+            self.logger.error(f"Error al buscar registros: {e}")
+            return {"error": "Error al buscar registros"}, 500
+
+    @staticmethod
+    def _normalizar_busqueda(value):
+        """Quita acentos y mayúsculas como la collation de búsqueda"""
+        if not isinstance(value, str):
+            return ""
+        decomposed = unicodedata.normalize("NFKD", value.strip())
+        return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+    def RFC_Filtro(self, spec=None):
         """Traer el json para descarga de los datos ya filtrados"""
         try: 
-            rfc_filtro_collection = self.db_conn.db['PruebaIP2']    
-            projection = {
-                "_id": 0,  # No incluir el _id de Mongo                
-            }        
-            data = list(rfc_filtro_collection.find({}, projection))
+            data = list(self.Filtro_Cursor("rfc", spec=spec))
             return data, 200
+        except ValueError as e:
+            return {"error": str(e)}, 400
         except Exception as e:
             self.logger.error(f"Error al obtener la colección 'RFC_Filtro':{e}")
             return {"error": "Error al obtener el filtrado de RFC"}, 500     
     
-    def Telefonia_Filtro(self):
+    def Telefonia_Filtro(self, spec=None):
         """Traer el json para descarga de los datos ya filtrados"""
         try: 
-            tel_filtro_collection = self.db_conn.db['PruebaTel']    
-            projection = {
-                "_id": 0,  # No incluir el _id de Mongo                
-            }        
-            data = list(tel_filtro_collection.find({}, projection))
+            data = list(self.Filtro_Cursor("tel", spec=spec))
             return data, 200
+        except ValueError as e:
+            return {"error": str(e)}, 400
         except Exception as e:
             self.logger.error(f"Error al obtener la colección 'Tel_Filtro':{e}")
             return {"error": "Error al obtener el filtrado de RFC"}, 500    
 
-    def VPN_Filtro(self):
+    def VPN_Filtro(self, spec=None):
         """Traer el json para descarga de los datos ya filtrados"""
         try: 
-            vpn_filtro_collection = self.db_conn.db['PruebaVPN']    
-            projection = {
-                "_id": 0,  # No incluir el _id de Mongo                
-            }        
-            data = list(vpn_filtro_collection.find({}, projection))
+            data = list(self.Filtro_Cursor("vpn", spec=spec))
             return data, 200
+        except ValueError as e:
+            return {"error": str(e)}, 400
         except Exception as e:
             self.logger.error(f"Error al obtener la colección 'VPN_Filtro':{e}")
             return {"error": "Error al obtener el filtrado de RFC"}, 500         
-    def Inter_Filtro(self):
+    def Inter_Filtro(self, spec=None):
         """Traer el json para descarga de los datos ya filtrados"""
         try: 
-            vpn_filtro_collection = self.db_conn.db['PruebaInter']    
-            projection = {
-                "_id": 0,  # No incluir el _id de Mongo                
-            }        
-            data = list(vpn_filtro_collection.find({}, projection))
+            data = list(self.Filtro_Cursor("inter", spec=spec))
             return data, 200
+        except ValueError as e:
+            return {"error": str(e)}, 400
         except Exception as e:
             self.logger.error(f"Error al obtener la colección 'Inter_Filtro':{e}")
             return {"error": "Error al obtener el filtrado de RFC"}, 500  
+
+    def _validar_campo_filtro(self, tipo, field, sort=False):
+        """Valida que un campo pueda usarse para filtrar, ordenar (sort) o proyectar.
+
+        Ordenar por un campo sin índice obliga a Mongo a ordenar la colección
+        completa, así que solo se ordena por los campos de FILTRO_CAMPOS_<TIPO>.
+        """
+        allowed = self.filtro_fields.get(tipo)
+        if allowed:
+            if field not in allowed:
+                raise ValueError(f"Campo no permitido para {tipo}: {field}")
+        elif sort:
+            raise ValueError(
+                f"No se puede ordenar {tipo} por {field}: solo se ordena por los campos de FILTRO_CAMPOS_{tipo.upper()}"
+            )
+        elif field.startswith("$") or "\0" in field:
+            raise ValueError(f"Nombre de campo inválido: {field}")
+
+    def _construir_consulta_filtro(self, tipo, spec):
+        """Traduce una especificación ya validada por FilterSpecSchema a la
+        consulta, proyección y orden de Mongo.
+
+        Cada condición del filtro es un valor (igualdad), un rango
+        {"gte"|"gt"|"lte"|"lt": valor} o un prefijo {"prefix": "texto"}.
+        """
+        query = {}
+        for field, condition in spec.get("filtro", {}).items():
+            self._validar_campo_filtro(tipo, field)
+            if isinstance(condition, dict):
+                if not condition:
+                    raise ValueError(f"Condición vacía para {field}")
+                unknown = set(condition) - FILTRO_OPERATORS.keys()
+                if unknown:
+                    raise ValueError(f"Operadores no soportados para {field}: {', '.join(sorted(unknown))}")
+                if "prefix" in condition:
+                    if len(condition) > 1 or not isinstance(condition["prefix"], str):
+                        raise ValueError(f"prefix debe ser un texto y no combinarse con rangos: {field}")
+                    query[field] = {"$regex": f"^{re.escape(condition['prefix'])}"}
+                    continue
+                for operator, value in condition.items():
+                    if not isinstance(value, FILTRO_SCALAR_TYPES):
+                        raise ValueError(f"Valor inválido para {field}.{operator}")
+                query[field] = {FILTRO_OPERATORS[operator]: value for operator, value in condition.items()}
+            elif condition is None or isinstance(condition, FILTRO_SCALAR_TYPES):
+                query[field] = condition
+            else:
+                raise ValueError(f"Valor inválido para {field}")
+
+        projection = {"_id": 0}
+        for field in spec.get("campos") or []:
+            self._validar_campo_filtro(tipo, field)
+            projection[field] = 1
+
+        sort = []
+        for item in spec.get("orden", []):
+            self._validar_campo_filtro(tipo, item["campo"], sort=True)
+            sort.append((item["campo"], ASCENDING if item["direccion"] == "asc" else DESCENDING))
+
+        return query, projection, sort
+
+    def asegurar_indices(self):
+        """Crea los índices que respaldan los filtros permitidos de las colecciones *Filtro,
+        la búsqueda de formularios, la bitácora de errores y la colección de borrados"""
+        for tipo, allowed in self.filtro_fields.items():
+            collection = self.db_conn.db[FILTRO_COLLECTIONS[tipo]]
+            for field in allowed:
+                try:
+                    collection.create_index([(field, ASCENDING)])
+                except Exception as e:
+                    self.logger.warning(f"No se pudo crear el índice {field} en {FILTRO_COLLECTIONS[tipo]}: {e}")
+
+        for tipo, search_fields in SEARCH_FIELDS.items():
+            collection = self.db_conn.db[FORM_TYPES[tipo][0]]
+            for field in search_fields:
+                try:
+                    # Mismo orden que las consultas de buscar_registros
+                    collection.create_index(
+                        [(field, ASCENDING), ("_id", DESCENDING)], collation=SEARCH_COLLATION, name=f"busqueda_{field}_id"
+                    )
+                    # El índice anterior solo sobre el campo ya no se usa
+                    if f"busqueda_{field}" in collection.index_information():
+                        collection.drop_index(f"busqueda_{field}")
+                except Exception as e:
+                    self.logger.warning(f"No se pudo crear el índice de búsqueda {field} en {collection.name}: {e}")
+
+        errores = self.db_conn.db[ERRORES_COLLECTION]
+        try:
+            errores.create_index([("Fecha", DESCENDING), ("_id", DESCENDING)])
+            errores.create_index([("Base de datos", ASCENDING), ("Fecha", DESCENDING), ("_id", DESCENDING)])
+            if ERRORES_RETENTION_DAYS > 0:
+                self._asegurar_ttl(errores, "Fecha", ERRORES_RETENTION_DAYS * 86400)
+        except Exception as e:
+            self.logger.warning(f"No se pudieron crear los índices de {ERRORES_COLLECTION}: {e}")
+
+        tombstones = self.db_conn.db[TOMBSTONE_COLLECTION]
+        try:
+            tombstones.create_index([("coleccion", ASCENDING), ("eliminado", ASCENDING)])
+            tombstones.create_index(
+                [("eliminado", ASCENDING)], expireAfterSeconds=TOMBSTONE_RETENTION_DAYS * 86400
+            )
+        except Exception as e:
+            self.logger.warning(f"No se pudieron crear los índices de {TOMBSTONE_COLLECTION}: {e}")
+
+    def _asegurar_ttl(self, collection, field, seconds):
+        """Crea el índice TTL de field o actualiza su vigencia si ya existe con otra"""
+        try:
+            collection.create_index([(field, ASCENDING)], expireAfterSeconds=seconds)
+        except OperationFailure as e:
+            # IndexOptionsConflict: el índice existe con otro expireAfterSeconds
+            if e.code != 85:
+                raise
+            self.db_conn.db.command(
+                "collMod", collection.name,
+                index={"keyPattern": {field: ASCENDING}, "expireAfterSeconds": seconds}
+            )
+
+    def Filtro_Cursor(self, tipo, batch_size=FILTRO_BATCH_SIZE, spec=None):
+        """Cursor sobre la colección filtrada de `tipo` para descargas en streaming.
+
+        A diferencia de *_Filtro no materializa la colección: los documentos
+        se piden a Mongo por lotes de batch_size conforme se consumen. Con spec
+        el filtro, el orden y los campos se resuelven en Mongo.
+        """
+        collection = self.db_conn.db[FILTRO_COLLECTIONS[tipo]]
+        if FILTRO_RAW_BSON:
+            collection = collection.with_options(codec_options=CodecOptions(document_class=RawBSONDocument))
+        if not spec:
+            return collection.find({}, {"_id": 0}, batch_size=batch_size)
+
+        query, projection, sort = self._construir_consulta_filtro(tipo, spec)
+        cursor = collection.find(query, projection, batch_size=batch_size)
+        if sort:
+            cursor = cursor.sort(sort).allow_disk_use(True)
+        return cursor
+
+    def Exportar_Cursor(self, tipo, origen="filtrado", spec=None):
+        """Regresa (columnas, documentos) para exportar el tipo de formulario.
+
+        origen "resumen" recorre la colección del formulario con la proyección
+        de su resumen, que también da el orden de columnas. origen "filtrado"
+        recorre la colección *Filtro; las columnas salen de spec.fields, de
+        FILTRO_CAMPOS_<TIPO> o, si no hay ninguno, del primer documento.
+        """
+        if origen == "resumen":
+            projection = RESUMEN_PROJECTIONS[tipo]
+            collection = self.db_conn.db[FORM_TYPES[tipo][0]]
+            cursor = collection.find({}, projection, batch_size=FILTRO_BATCH_SIZE).sort("_id", ASCENDING)
+            return list(projection), cursor
+
+        cursor = self.Filtro_Cursor(tipo, FILTRO_BATCH_SIZE, spec)
+        columns = (spec or {}).get("campos") or self.filtro_fields.get(tipo)
+        if columns:
+            return list(columns), cursor
+
+        first = next(cursor, None)
+        if first is None:
+            cursor.close()
+            return [], iter(())
+        return list(first.keys()), itertools.chain([first], cursor)
+
     def borrar_registro(self, noFormato, collection_name):
         
         collection = self.db_conn.db[collection_name]
         resultado = collection.delete_one({'_id': noFormato})
+        if resultado.deleted_count:
+            self._registrar_eliminados(collection_name, [noFormato])
+        self.cache.invalidate(collection_name)
+        self._bump_version(collection_name)
 
         if resultado:
             return {"mensaje":"registro eliminado con exito"},404
@@ -296,10 +1111,186 @@ class Service:
         id_documento = noFormato[:6]
         collection = self.db_conn.db[collection_name_counter]
         resultado = collection.update_one({'_id': id_documento}, {'$inc':{'seq':-1}})
+        self.rollups.adjust(collection_name_counter, id_documento, -1)
+        self.cache.invalidate(collection_name_counter)
+        self._bump_version(collection_name_counter)
         if resultado:
             return {"mensaje":"contador eliminado con exito"},404
         else:
             return {"mensaje":"id no encontrado"},400
+
+    def borrar_registros_masivo(self, ids_por_tipo, use_transaction=False):
+        """Borra varios registros por tipo de formulario con un delete_many por
+        colección y un solo bulk_write de $inc por día en sus contadores.
+
+        ids_por_tipo es {tipo: [noFormato, ...]}. Regresa el resultado de cada
+        id ("eliminado" o "no encontrado"). Con use_transaction todo se aplica
+        en una transacción (requiere replica set); sin ella un borrado
+        concurrente del mismo id puede descontarse dos veces.
+        """
+        try:
+            def run(session=None):
+                resultados = {}
+                for tipo, ids in ids_por_tipo.items():
+                    collection_name, counter_name = FORM_TYPES[tipo]
+                    collection = self.db_conn.db[collection_name]
+                    ids = list(dict.fromkeys(ids))
+
+                    existing = [
+                        record["_id"]
+                        for record in collection.find({"_id": {"$in": ids}}, {"_id": 1}, session=session)
+                    ]
+                    if existing:
+                        collection.delete_many({"_id": {"$in": existing}}, session=session)
+                        self._registrar_eliminados(collection_name, existing, session=session)
+
+                        decrements = {day_id: -count for day_id, count in Counter(i[:6] for i in existing).items()}
+                        self.db_conn.db[counter_name].bulk_write(
+                            [UpdateOne({"_id": day_id}, {"$inc": {"seq": delta}}) for day_id, delta in decrements.items()],
+                            ordered=False,
+                            session=session
+                        )
+                        self.rollups.adjust_many(counter_name, decrements, session=session)
+                        self._bump_version(collection_name, session=session)
+                        self._bump_version(counter_name, session=session)
+
+                    found = set(existing)
+                    resultados[tipo] = {i: "eliminado" if i in found else "no encontrado" for i in ids}
+                return resultados
+
+            if use_transaction:
+                with self.db_conn.client.start_session() as session:
+                    resultados = session.with_transaction(run)
+            else:
+                resultados = run()
+
+            for tipo in ids_por_tipo:
+                for collection_name in FORM_TYPES[tipo]:
+                    self.cache.invalidate(collection_name)
+
+            eliminados = sum(
+                1 for por_id in resultados.values() for estado in por_id.values() if estado == "eliminado"
+            )
+            return {"resultados": resultados, "eliminados": eliminados}, 200
+        except Exception as e:
+            self.logger.error(f"Error en el borrado masivo: {e}")
+            return {"error": "Error en el borrado masivo"}, 500
+
+    def ingestar_formularios(self, tipo, formularios, use_transaction=False):
+        """Inserta en lote [(índice, formulario)] ya validados y sus contadores diarios;
+        regresa los insertados y los errores por índice"""
+        try:
+            collection_name, counter_name = FORM_TYPES[tipo]
+            collection = self.db_conn.db[collection_name]
+            errores = {}
+            indices, documentos = [], []
+            for index, formulario in formularios:
+                no_formato = formulario.pop("id")
+                try:
+                    datetime.strptime(no_formato[:6], "%y%m%d")
+                except ValueError:
+                    errores[index] = {"id": ["El noFormato debe empezar con la fecha %y%m%d"]}
+                    continue
+                indices.append(index)
+                documentos.append({"_id": no_formato, **formulario})
+
+            def insert(session=None):
+                """Regresa (posiciones insertadas, errores de escritura por índice)"""
+                posiciones = list(range(len(documentos)))
+                errores_escritura = {}
+                if session is not None:
+                    # En una transacción un duplicado la abortaría completa
+                    existentes = {
+                        record["_id"] for record in collection.find(
+                            {"_id": {"$in": [documento["_id"] for documento in documentos]}}, {"_id": 1}, session=session
+                        )
+                    }
+                    for position in posiciones:
+                        if documentos[position]["_id"] in existentes:
+                            errores_escritura[indices[position]] = {"id": ["El noFormato ya existe"]}
+                    posiciones = [position for position in posiciones if documentos[position]["_id"] not in existentes]
+                if not posiciones:
+                    return set(), errores_escritura
+
+                insertados = set(posiciones)
+                try:
+                    collection.insert_many([documentos[position] for position in posiciones], ordered=False, session=session)
+                except BulkWriteError as e:
+                    for write_error in e.details.get("writeErrors", []):
+                        position = posiciones[write_error["index"]]
+                        insertados.discard(position)
+                        mensaje = "El noFormato ya existe" if write_error.get("code") == 11000 else write_error.get("errmsg")
+                        errores_escritura[indices[position]] = {"id": [mensaje]}
+                return insertados, errores_escritura
+
+            def increments(insertados):
+                return dict(Counter(documentos[position]["_id"][:6] for position in insertados))
+
+            def count(insertados, session=None):
+                self.db_conn.db[counter_name].bulk_write(
+                    [
+                        UpdateOne({"_id": day_id}, {"$inc": {"seq": delta}}, upsert=True)
+                        for day_id, delta in increments(insertados).items()
+                    ],
+                    ordered=False,
+                    session=session
+                )
+                self.rollups.adjust_many(counter_name, increments(insertados), session=session)
+
+            pendientes = None
+            if not documentos:
+                insertados = set()
+            elif use_transaction:
+                # Formularios y contadores juntos (requiere replica set)
+                def run(session):
+                    insertados, errores_escritura = insert(session)
+                    if insertados:
+                        count(insertados, session)
+                    return insertados, errores_escritura
+
+                with self.db_conn.client.start_session() as session:
+                    insertados, errores_escritura = session.with_transaction(run)
+                errores.update(errores_escritura)
+            else:
+                insertados, errores_escritura = insert()
+                errores.update(errores_escritura)
+                if insertados:
+                    try:
+                        count(insertados)
+                    except Exception as e:
+                        # Los formularios ya están guardados: se reporta lo que falta
+                        # en los contadores en lugar de perder el resultado por índice
+                        pendientes = increments(insertados)
+                        self.logger.error(
+                            f"Ingesta {tipo}: contadores de {counter_name} sin actualizar, incrementos pendientes {pendientes}: {e}"
+                        )
+
+            if insertados:
+                # noFormato anteriores a los existentes: los tokens de cambios previos reciben 410
+                self._marcar_retroactivo(collection, [documentos[position]["_id"] for position in insertados])
+                for name in (collection_name, counter_name):
+                    self.cache.invalidate(name)
+                    self._bump_version(name)
+
+            resultado = {"insertados": len(insertados), "errores": errores}
+            if pendientes:
+                resultado["contadores_pendientes"] = pendientes
+            return resultado, 200
+        except Exception as e:
+            self.logger.error(f"Error en la ingesta de formularios {tipo}: {e}")
+            return {"error": "Error en la ingesta de formularios"}, 500
+
+    def _marcar_retroactivo(self, collection, ids):
+        """Marca la colección si alguno de los ids insertados quedó por debajo
+        de un _id que ya existía, es decir, detrás de los cursores de cambios"""
+        # La hora se toma después de insertar: todo token emitido antes es menor
+        marca = datetime.now(timezone.utc).timestamp()
+        mayores = collection.count_documents({"_id": {"$gt": min(ids)}}, limit=len(ids))
+        if mayores >= len(ids):
+            self.db_conn.db[VERSIONS_COLLECTION].update_one(
+                {"_id": collection.name}, {"$max": {"retroactivo": marca}}, upsert=True
+            )
+
     def obtener_datos_por_id(self, collection_name: str, document_id: str) -> dict:            
             
             try:
@@ -316,7 +1307,7 @@ class Service:
                 # Manejar otros posibles errores (ej. de conexión)
                 print(f"Ocurrió un error inesperado: {e}")
                 return None, 500
-    def obtener_registro_errores(self):
+    def obtener_registro_errores(self, desde=None, hasta=None, bases=None, limit=None, after=None, resumen=False):
         """"
         Obtrendremos los datos de la base de datos errores 
         Base de datos        
@@ -324,22 +1315,87 @@ class Service:
         Fecha
         """
         try:
-            errores_collection = self.db_conn.db['Errores']
-            projection = {
-                "_id": 1,
-                "Base de datos": 1,
-                "Mensaje": 1,
-                "Fecha": 1,
-            }
-            registros_telefonia = list(errores_collection.find({}, projection))
-            analytic_data=[]
-            for registro in registros_telefonia:
-                analytic_data.append({
-                    "Bases": registro.get("Base de datos", ""),
-                    "Mensaje": registro.get("Mensaje", ""),
-                    "Fecha":registro.get("Fecha","")
-                })
-            return analytic_data, 200
+            errores_collection = self.db_conn.db[ERRORES_COLLECTION]
+            # hasta es exclusivo
+            match = {}
+            if desde or hasta:
+                match["Fecha"] = {}
+                if desde:
+                    match["Fecha"]["$gte"] = desde
+                if hasta:
+                    match["Fecha"]["$lt"] = hasta
+            if bases:
+                match["Base de datos"] = {"$in": list(bases)}
+
+            if resumen:
+                return self._resumir_errores(errores_collection, match), 200
+
+            pipeline = [{"$match": match}] if match else []
+            # Sin limit se regresa la lista completa; con limit una página del más
+            # reciente al más viejo cuyo "siguiente" se pasa como after
+            if limit is not None:
+                if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+                    raise ValueError("limit debe ser un entero positivo")
+                limit = min(limit, MAX_PAGE_SIZE)
+                if after:
+                    fecha, last_id = self._leer_cursor_errores(after)
+                    pipeline.append({"$match": {"$or": [
+                        {"Fecha": {"$lt": fecha}},
+                        {"Fecha": fecha, "_id": {"$lt": last_id}}
+                    ]}})
+                pipeline += [{"$sort": {"Fecha": DESCENDING, "_id": DESCENDING}}, {"$limit": limit}]
+
+            pipeline.append({"$project": {
+                "_id": 1 if limit is not None else 0,
+                "Bases": {"$ifNull": ["$Base de datos", ""]},
+                "Mensaje": {"$ifNull": ["$Mensaje", ""]},
+                "Fecha": {"$ifNull": ["$Fecha", ""]}
+            }})
+            analytic_data = list(errores_collection.aggregate(pipeline))
+            if limit is None:
+                return analytic_data, 200
+
+            siguiente = None
+            last = analytic_data[-1] if analytic_data else None
+            # Los errores sin Fecha quedan fuera del recorrido por páginas
+            if len(analytic_data) == limit and isinstance(last["Fecha"], datetime):
+                siguiente = f"{last['Fecha'].isoformat()}_{last['_id']}"
+            for registro in analytic_data:
+                del registro["_id"]
+            return {"registros": analytic_data, "siguiente": siguiente}, 200
+        except ValueError as e:
+            return {"error": str(e)}, 400
         except Exception as e:
             self.logger.error(f"Error al obtener datos de la colección 'errores': {e}")
-            return {"error": "Error al obtener datos de Errores"}, 500
\ No newline at end of file
+            return {"error": "Error al obtener datos de Errores"}, 500
+
+    @staticmethod
+    def _leer_cursor_errores(after):
+        """Separa el cursor "<Fecha ISO>_<ObjectId>" de la página de errores"""
+        try:
+            fecha, last_id = after.rsplit("_", 1)
+            return datetime.fromisoformat(fecha), ObjectId(last_id)
+        except Exception:
+            raise ValueError("after no es un cursor de errores válido")
+
+    def _resumir_errores(self, errores_collection, match):
+        """Conteo de errores por día y base de datos con una agregación"""
+        pipeline = [{"$match": match}] if match else []
+        pipeline += [
+            {"$group": {
+                "_id": {
+                    "dia": {"$dateToString": {"format": "%Y-%m-%d", "date": "$Fecha", "timezone": ERRORES_TIMEZONE}},
+                    "base": {"$ifNull": ["$Base de datos", ""]}
+                },
+                "total": {"$sum": 1}
+            }},
+            {"$sort": {"_id.dia": ASCENDING, "_id.base": ASCENDING}}
+        ]
+        dias = {}
+        total = 0
+        for grupo in errores_collection.aggregate(pipeline):
+            dia = dias.setdefault(grupo["_id"]["dia"], {"Fecha": grupo["_id"]["dia"], "Bases": {}, "total": 0})
+            dia["Bases"][grupo["_id"]["base"]] = grupo["total"]
+            dia["total"] += grupo["total"]
+            total += grupo["total"]
+        return {"dias": list(dias.values()), "total": total}
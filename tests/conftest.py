@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+
+# Los módulos de la API se importan desde la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# En pruebas el log va a un directorio temporal en lugar de /app/logs
+os.environ.setdefault("LOG_FILE", os.path.join(tempfile.mkdtemp(prefix="dash_api_logs_"), "dash_api.log"))
+
+import mongomock  # noqa: E402
+import pytest  # noqa: E402
+from mongomock.collection import BulkOperationBuilder  # noqa: E402
+
+# pymongo >= 4.11 pasa sort a los UpdateOne de bulk_write y mongomock 4.3 no lo acepta
+_add_update = BulkOperationBuilder.add_update
+
+def _add_update_sin_sort(self, *args, sort=None, **kwargs):
+    return _add_update(self, *args, **kwargs)
+
+BulkOperationBuilder.add_update = _add_update_sin_sort
+
+class MockConnection:
+    """Sustituto de BDModel sobre mongomock para las pruebas de servicio y rutas"""
+
+    def __init__(self):
+        self.client = mongomock.MongoClient()
+        self.db = self.client["project"]
+
+    def pool_stats(self):
+        return {"max_pool_size": 100, "connections_checked_out": 0, "last_success": None}
+
+    def add_event_listener(self, listener):
+        pass
+
+    def on_connect(self, callback):
+        pass
+
+@pytest.fixture
+def db_conn():
+    return MockConnection()
+
+@pytest.fixture
+def service(db_conn):
+    from services.service import Service
+    return Service(db_conn)
+
+@pytest.fixture
+def app(service):
+    from flask import Flask
+    from routes.route import FileGeneratorRoute
+    from schemas.schema import Schema
+    from serializers.json_provider import BSONJSONProvider
+
+    app = Flask(__name__)
+    app.json = BSONJSONProvider(app)
+    app.register_blueprint(FileGeneratorRoute(service, Schema()))
+    return app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,51 @@
+from datetime import date
+from services.rollup import ROLLUP_COLLECTION
+
+def seed(db_conn):
+    db_conn.db["rfc"].insert_many([{"_id": "2510060001"}, {"_id": "2510060002"}, {"_id": "2510070001"}])
+    db_conn.db["rfcCounters"].insert_many([{"_id": "251006", "seq": 2}, {"_id": "251007", "seq": 1}])
+    db_conn.db["tel"].insert_one({"_id": "2510060001"})
+    db_conn.db["telCounters"].insert_one({"_id": "251006", "seq": 1})
+
+def counters(db_conn, name):
+    return {record["_id"]: record["seq"] for record in db_conn.db[name].find()}
+
+def test_deletes_and_decrements_per_day(service, db_conn):
+    seed(db_conn)
+    resultado, status = service.borrar_registros_masivo({
+        "rfc": ["2510060001", "2510060002", "2510070001", "2510060001", "2510089999"],
+        "tel": ["2510060001"],
+    })
+
+    assert status == 200
+    assert resultado["eliminados"] == 4
+    assert resultado["resultados"]["rfc"] == {
+        "2510060001": "eliminado",
+        "2510060002": "eliminado",
+        "2510070001": "eliminado",
+        "2510089999": "no encontrado",
+    }
+    assert db_conn.db["rfc"].count_documents({}) == 0
+    # El id repetido se descuenta una sola vez
+    assert counters(db_conn, "rfcCounters") == {"251006": 0, "251007": 0}
+    assert counters(db_conn, "telCounters") == {"251006": 0}
+
+def test_adjusts_rollups_and_invalidates_cache(service, db_conn):
+    seed(db_conn)
+    service.rollups.rebuild(["rfcCounters"], date(2025, 10, 1), date(2025, 10, 31))
+    service.get_analytics_data()
+
+    service.borrar_registros_masivo({"rfc": ["2510060001"]})
+    rollups = {record["_id"]: record["seq"] for record in db_conn.db[ROLLUP_COLLECTION].find()}
+    assert rollups["rfcCounters:semana:251006"] == 2
+    assert rollups["rfcCounters:mes:251001"] == 2
+    assert service._cached_form_counts()[0] is False
+
+def test_route_validates_the_body(client, db_conn):
+    seed(db_conn)
+    assert client.post("/api2/v1/borrarMasivo", json={"ids": {"nada": ["2510060001"]}}).status_code == 400
+    assert client.post("/api2/v1/borrarMasivo", json={"ids": {}}).status_code == 400
+
+    response = client.post("/api2/v1/borrarMasivo", json={"ids": {"rfc": ["2510060001"]}})
+    assert response.status_code == 200
+    assert response.get_json()["resultados"] == {"rfc": {"2510060001": "eliminado"}}
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+import services.service as service_module
+
+def test_dashboard_shares_cache_with_single_endpoints(service, db_conn, monkeypatch):
+    db_conn.db["rfc"].insert_one({"_id": "2510170001"})
+    counts, status = service.get_analytics_data()
+    assert status == 200
+
+    today = datetime.now()
+    previous_monday = today - timedelta(days=today.weekday(), weeks=1)
+    series = service.get_counter_series(
+        service_module.COUNTER_COLLECTIONS, previous_monday, previous_monday + timedelta(days=13)
+    )
+
+    calls = []
+    monkeypatch.setattr(service, "_count_form", lambda *args: calls.append(args))
+    monkeypatch.setattr(service, "get_daily_registration_counts", lambda *args: calls.append(args))
+
+    dashboard, status = service.get_dashboard(["form-counts", "weekly-registrations"])
+    assert status == 200
+    assert calls == []
+    assert dashboard["form-counts"] == counts
+    assert dashboard["counter-series"] == series
+
+def test_dashboard_reads_rollups_in_the_fan_out(service, monkeypatch):
+    batches = []
+    original = service_module.fan_out
+
+    def recording_fan_out(fn, items, *args, **kwargs):
+        batches.append(list(items))
+        return original(fn, items, *args, **kwargs)
+
+    monkeypatch.setattr(service_module, "fan_out", recording_fan_out)
+    dashboard, status = service.get_dashboard(service_module.DASHBOARD_SECTIONS)
+
+    assert status == 200
+    assert ("rollups", None) in batches[0]
+    assert ("daily", "rfcCounters") in batches[0]
+    assert set(dashboard["weekly-stats"]) == {"vpn", "internet", "rfc", "telefonia"}
+
+    # La siguiente vez todo sale de la caché
+    batches.clear()
+    assert service.get_dashboard(service_module.DASHBOARD_SECTIONS)[0] == dashboard
+    assert batches == [[]]
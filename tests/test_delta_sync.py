@@ -0,0 +1,95 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+import services.service as service_module
+
+def token_payload(token):
+    encoded = token[len(service_module.SYNC_TOKEN_PREFIX):]
+    return json.loads(base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+
+def make_token(service, collection, last_id, since_time):
+    return service._sync_token(collection, last_id, since_time)
+
+def insert_rfc(db_conn, *ids):
+    db_conn.db["rfc"].insert_many([{"_id": i, "noticket": f"TK{i}"} for i in ids])
+
+def test_token_round_trip_returns_only_new_records(service, db_conn):
+    insert_rfc(db_conn, "2510170001", "2510170002")
+    first, status = service.RFC_Registros_Resumen(since="")
+    assert status == 200
+    assert [r["_id"] for r in first["registros"]] == ["2510170001", "2510170002"]
+    assert first["completo"] is True
+    assert token_payload(first["token"])["id"] == "2510170002"
+
+    insert_rfc(db_conn, "2510170003")
+    second, status = service.RFC_Registros_Resumen(since=first["token"])
+    assert status == 200
+    assert [r["_id"] for r in second["registros"]] == ["2510170003"]
+    assert second["eliminados"] == []
+
+    third, _ = service.RFC_Registros_Resumen(since=second["token"])
+    assert third["registros"] == []
+    assert token_payload(third["token"])["id"] == "2510170003"
+
+def test_paging_keeps_the_deletion_cursor_until_complete(service, db_conn):
+    insert_rfc(db_conn, *[f"25101700{n:02d}" for n in range(1, 6)])
+    since_time = datetime.now(timezone.utc) - timedelta(hours=1)
+    token = make_token(service, "rfc", None, since_time)
+
+    page, _ = service.RFC_Registros_Resumen(limit=2, since=token)
+    assert len(page["registros"]) == 2
+    assert page["completo"] is False
+    # Mientras queden insertados por leer la hora de los borrados no avanza
+    assert token_payload(page["token"])["t"] == since_time.timestamp()
+
+    seen = [r["_id"] for r in page["registros"]]
+    while not page["completo"]:
+        page, _ = service.RFC_Registros_Resumen(limit=2, since=page["token"])
+        seen += [r["_id"] for r in page["registros"]]
+    assert seen == [f"25101700{n:02d}" for n in range(1, 6)]
+    assert token_payload(page["token"])["t"] > since_time.timestamp()
+
+def test_deleted_records_are_reported_as_tombstones(service, db_conn):
+    insert_rfc(db_conn, "2510170001", "2510170002")
+
+    # La lápida se guarda ahora; el token se mueve atrás del traslape
+    token = make_token(service, "rfc", "2510170002", datetime.now(timezone.utc) - timedelta(minutes=1))
+    service.borrar_registro("2510170001", "rfc")
+    changes, status = service.RFC_Registros_Resumen(since=token)
+    assert status == 200
+    assert changes["registros"] == []
+    assert changes["eliminados"] == ["2510170001"]
+
+    # Borrados de otras colecciones no se mezclan
+    db_conn.db["tel"].insert_one({"_id": "2510170009"})
+    service.borrar_registro("2510170009", "tel")
+    changes, _ = service.RFC_Registros_Resumen(since=token)
+    assert changes["eliminados"] == ["2510170001"]
+
+def test_bulk_delete_records_tombstones(service, db_conn):
+    insert_rfc(db_conn, "2510170001", "2510170002")
+    token = make_token(service, "rfc", "2510170002", datetime.now(timezone.utc) - timedelta(minutes=1))
+    service.borrar_registros_masivo({"rfc": ["2510170001", "2510170002", "2510179999"]})
+    changes, _ = service.RFC_Registros_Resumen(since=token)
+    assert sorted(changes["eliminados"]) == ["2510170001", "2510170002"]
+
+def test_expired_cursor_gets_410(service):
+    old = datetime.now(timezone.utc) - timedelta(days=service_module.TOMBSTONE_RETENTION_DAYS + 1)
+    body, status = service.RFC_Registros_Resumen(since=make_token(service, "rfc", None, old))
+    assert status == 410
+    assert body["recargar"] is True
+
+    # Un noFormato viejo como cursor también expira
+    body, status = service.RFC_Registros_Resumen(since=old.strftime("%y%m%d") + "0001")
+    assert status == 410
+
+def test_invalid_tokens_are_400(service):
+    assert service.RFC_Registros_Resumen(since="v1.nope")[1] == 400
+    token = make_token(service, "tel", None, datetime.now(timezone.utc))
+    assert service.RFC_Registros_Resumen(since=token)[1] == 400
+
+def test_route_returns_410_with_reload_flag(client):
+    old = datetime.now(timezone.utc) - timedelta(days=service_module.TOMBSTONE_RETENTION_DAYS + 1)
+    response = client.post("/api2/v1/rfcGet", json={"since": old.strftime("%y%m%d") + "0001"})
+    assert response.status_code == 410
+    assert response.get_json()["recargar"] is True
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+from bson import ObjectId
+
+START = datetime(2025, 10, 1, 12, 0)
+
+def seed(db_conn):
+    # Varias filas comparten Fecha para probar el desempate por _id
+    documentos = [
+        {"_id": ObjectId(), "Base de datos": "rfc" if n % 3 else "tel", "Mensaje": f"error {n}", "Fecha": START + timedelta(hours=n // 2)}
+        for n in range(25)
+    ]
+    db_conn.db["Errores"].insert_many(documentos)
+    return documentos
+
+def test_pages_cover_every_error_once_newest_first(service, db_conn):
+    seed(db_conn)
+    seen, after = [], None
+    while True:
+        page, status = service.obtener_registro_errores(limit=4, after=after)
+        assert status == 200
+        seen += page["registros"]
+        after = page["siguiente"]
+        if after is None:
+            break
+    assert len(seen) == 25
+    assert len({registro["Mensaje"] for registro in seen}) == 25
+    fechas = [registro["Fecha"] for registro in seen]
+    assert fechas == sorted(fechas, reverse=True)
+
+def test_filters_by_range_and_database(service, db_conn):
+    seed(db_conn)
+    registros, status = service.obtener_registro_errores(
+        desde=START + timedelta(hours=2), hasta=START + timedelta(hours=4), bases=["tel"]
+    )
+    assert status == 200
+    assert {registro["Mensaje"] for registro in registros} == {"error 6"}
+    assert set(registros[0]) == {"Bases", "Mensaje", "Fecha"}
+
+def test_invalid_cursor_is_400(service):
+    assert service.obtener_registro_errores(limit=5, after="nope")[1] == 400
+    assert service.obtener_registro_errores(limit=0)[1] == 400
@@ -0,0 +1,36 @@
+def test_form_counts_etag_describes_the_cached_body(client, db_conn):
+    db_conn.db["rfc"].insert_one({"_id": "2510170001"})
+    first = client.get("/api2/v1/form-counts")
+    etag = first.headers["ETag"].strip('"')
+
+    # Otro servicio inserta: el cuerpo sigue en caché y el ETag debe seguirlo
+    db_conn.db["rfc"].insert_one({"_id": "2510170002"})
+    second = client.get("/api2/v1/form-counts", headers={"If-None-Match": f'"{etag}"'})
+    assert second.status_code == 304
+
+def test_form_counts_new_body_gets_new_etag(client, db_conn, service):
+    db_conn.db["rfc"].insert_one({"_id": "2510170001"})
+    first = client.get("/api2/v1/form-counts")
+    db_conn.db["rfc"].insert_one({"_id": "2510170002"})
+    service.cache.clear()
+
+    second = client.get("/api2/v1/form-counts", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert {"label": "Rfc", "value": 2} in second.get_json()
+
+def test_collection_versions_are_cached_and_invalidated_by_deletes(service, db_conn):
+    db_conn.db["rfc"].insert_one({"_id": "2510170001"})
+    first = service.get_collection_versions(["rfc"])
+    db_conn.db["rfc"].insert_one({"_id": "2510170002"})
+    assert service.get_collection_versions(["rfc"]) == first
+
+    service.borrar_registro("2510170002", "rfc")
+    assert service.get_collection_versions(["rfc"]) != first
+
+def test_list_etag_304(client, db_conn):
+    db_conn.db["rfc"].insert_one({"_id": "2510170001", "noticket": "TK1"})
+    first = client.post("/api2/v1/rfcGet", json={})
+    assert first.status_code == 200
+    second = client.post("/api2/v1/rfcGet", json={}, headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 304
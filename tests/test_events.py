@@ -0,0 +1,19 @@
+from services import live
+
+def test_events_rejects_clients_over_the_worker_limit(client, app, monkeypatch):
+    monkeypatch.setattr(live, "MAX_SUBSCRIBERS", 1)
+    routes = app.blueprints["file_generator"]
+    monkeypatch.setattr(routes.live, "_run", lambda: None)
+
+    first = client.get("/api2/v1/events", buffered=False)
+    assert first.status_code == 200
+    assert routes.live.subscriber_count() == 1
+
+    second = client.get("/api2/v1/events")
+    assert second.status_code == 503
+    assert second.headers["Retry-After"] == str(live.REJECT_RETRY_SECONDS)
+    assert second.get_data(as_text=True).startswith("retry: ")
+
+    # Al cerrar el primer stream se libera su lugar
+    first.close()
+    assert routes.live.subscriber_count() == 0
@@ -0,0 +1,31 @@
+import csv
+import io
+import zipfile
+from serializers.export import iter_csv, iter_xlsx
+
+DOCUMENTS = [
+    {"Nombre": "=HYPERLINK(\"http://x\",\"y\")", "Nota": "+1", "Extra": "-2"},
+    {"Nombre": "@SUM(A1)", "Nota": "\tTab", "Extra": "\rCR"},
+    {"Nombre": "Ana", "Nota": -5, "Extra": "http://example.com"},
+]
+COLUMNS = ["Nombre", "Nota", "Extra"]
+
+def dumps(value):
+    return str(value)
+
+def test_csv_prefixes_formula_cells():
+    text = "".join(iter_csv(COLUMNS, DOCUMENTS, dumps)).lstrip("\ufeff")
+    rows = list(csv.reader(io.StringIO(text, newline="")))
+    assert rows[1] == ["'=HYPERLINK(\"http://x\",\"y\")", "'+1", "'-2"]
+    assert rows[2] == ["'@SUM(A1)", "'\tTab", "'\rCR"]
+    # Los números y el texto normal no se tocan
+    assert rows[3] == ["Ana", "-5", "http://example.com"]
+
+def test_xlsx_writes_strings_as_text():
+    data = b"".join(iter_xlsx(COLUMNS, DOCUMENTS, dumps))
+    with zipfile.ZipFile(io.BytesIO(data)) as xlsx:
+        sheet = xlsx.read("xl/worksheets/sheet1.xml").decode()
+        names = xlsx.namelist()
+    assert "<f>" not in sheet
+    assert "=HYPERLINK" in sheet
+    assert not any("_rels/sheet1.xml.rels" in name for name in names)
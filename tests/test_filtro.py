@@ -0,0 +1,28 @@
+import pytest
+from services.service import Service
+
+SORT = {"orden": [{"campo": "estado", "direccion": "asc"}]}
+
+def test_filter_without_allowlist_accepts_fields_but_not_sort(service):
+    query, projection, sort = service._construir_consulta_filtro("rfc", {"filtro": {"estado": "abierto"}})
+    assert query == {"estado": "abierto"}
+    assert sort == []
+
+    with pytest.raises(ValueError, match="FILTRO_CAMPOS_RFC"):
+        service._construir_consulta_filtro("rfc", SORT)
+
+def test_allowlisted_fields_can_be_sorted(db_conn, monkeypatch):
+    monkeypatch.setenv("FILTRO_CAMPOS_RFC", "estado,fecha")
+    service = Service(db_conn)
+
+    _, _, sort = service._construir_consulta_filtro("rfc", SORT)
+    assert sort == [("estado", 1)]
+    with pytest.raises(ValueError):
+        service._construir_consulta_filtro("rfc", {"filtro": {"otro": 1}})
+
+    service.asegurar_indices()
+    assert "estado_1" in db_conn.db["PruebaIP2"].index_information()
+
+def test_filtrado_route_rejects_unindexed_sort(client):
+    response = client.post("/api2/v1/rfcFiltrado", json={"sort": [{"field": "estado", "direction": "asc"}]})
+    assert response.status_code == 400
@@ -0,0 +1,39 @@
+import time
+import mongomock
+from pymongo import _csot
+from models import health
+from models.health import ReadinessChecker
+
+class SlowConnection:
+    """Conexión cuyo cliente se crea al primer acceso, como BDModel"""
+
+    def __init__(self):
+        self._client = None
+        self.timeout_at_creation = "sin crear"
+
+    @property
+    def client(self):
+        if self._client is None:
+            self.timeout_at_creation = _csot.get_timeout()
+            self._client = mongomock.MongoClient()
+        return self._client
+
+    def pool_stats(self):
+        return {"max_pool_size": 100, "connections_checked_out": 0, "last_success": time.time()}
+
+def test_client_is_created_outside_the_ping_timeout():
+    db_conn = SlowConnection()
+    check = ReadinessChecker(db_conn)._check()
+    assert check["ping_ok"] is True
+    assert db_conn.timeout_at_creation is None
+
+def test_started_checker_is_ready_before_the_first_probe(monkeypatch):
+    monkeypatch.setattr(health, "CHECK_INTERVAL", 0.05)
+    checker = ReadinessChecker(SlowConnection())
+    checker.start()
+    deadline = time.monotonic() + 2
+    while checker._last_check is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    estado, ready = checker.status()
+    assert ready, estado["reasons"]
@@ -0,0 +1,62 @@
+import pytest
+from pymongo.errors import PyMongoError
+
+FORM = {
+    "noticket": "TK1",
+    "memo": "M1",
+    "descbreve": "Prueba",
+    "nombreJefe": "Jefe",
+}
+
+def formularios(*ids):
+    return [(index, {"id": no_formato, **FORM}) for index, no_formato in enumerate(ids)]
+
+def test_inserts_and_counts_per_day(service, db_conn):
+    db_conn.db["rfc"].insert_one({"_id": "2510170001"})
+    resultado, status = service.ingestar_formularios("rfc", formularios("2510170001", "2510170002", "2510180001", "xx"))
+
+    assert status == 200
+    assert resultado["insertados"] == 2
+    assert resultado["errores"][0] == {"id": ["El noFormato ya existe"]}
+    assert 3 in resultado["errores"]
+    counters = {record["_id"]: record["seq"] for record in db_conn.db["rfcCounters"].find()}
+    assert counters == {"251017": 1, "251018": 1}
+
+def test_counter_failure_keeps_per_item_result(service, db_conn, monkeypatch):
+    def fail(*args, **kwargs):
+        raise PyMongoError("sin conexión")
+
+    monkeypatch.setattr(type(db_conn.db["rfcCounters"]), "bulk_write", fail)
+    resultado, status = service.ingestar_formularios("rfc", formularios("2510170001", "2510170002"))
+
+    assert status == 200
+    assert resultado["insertados"] == 2
+    assert resultado["contadores_pendientes"] == {"251017": 2}
+    assert db_conn.db["rfc"].count_documents({}) == 2
+
+def test_backfill_expires_older_sync_tokens(service, db_conn):
+    db_conn.db["rfc"].insert_one({"_id": "2510170005"})
+    page, status = service.RFC_Registros_Resumen(since="")
+    assert status == 200
+
+    # Hacia adelante el token sigue siendo válido
+    service.ingestar_formularios("rfc", formularios("2510170006"))
+    forward, status = service.RFC_Registros_Resumen(since=page["token"])
+    assert status == 200
+    assert [record["_id"] for record in forward["registros"]] == ["2510170006"]
+
+    # Un noFormato anterior quedaría detrás del cursor: se pide recargar
+    service.ingestar_formularios("rfc", formularios("2510160001"))
+    expired, status = service.RFC_Registros_Resumen(since=forward["token"])
+    assert status == 410
+    assert expired["recargar"] is True
+
+@pytest.mark.parametrize("body, status", [
+    ([], 400),
+    ({"formularios": [{"id": "2510170001", **FORM}], "transaccion": "si"}, 400),
+])
+def test_route_rejects_invalid_bodies(client, body, status):
+    assert client.post("/api2/v1/ingesta/rfc", json=body).status_code == status
+
+def test_route_unknown_type(client):
+    assert client.post("/api2/v1/ingesta/nada", json=[{"id": "2510170001"}]).status_code == 404
@@ -0,0 +1,60 @@
+import decimal
+from datetime import datetime
+from bson import Decimal128, ObjectId
+from flask import Flask, jsonify
+import orjson
+import serializers.json_provider as json_provider
+from serializers.json_provider import BSONJSONProvider
+
+def make_app(debug=False):
+    app = Flask(__name__)
+    app.debug = debug
+    app.json = BSONJSONProvider(app)
+    return app
+
+def test_jsonify_goes_through_orjson(monkeypatch):
+    calls = []
+    real_dumps = orjson.dumps
+
+    def counting_dumps(*args, **kwargs):
+        calls.append(kwargs.get("option"))
+        return real_dumps(*args, **kwargs)
+
+    monkeypatch.setattr(json_provider.orjson, "dumps", counting_dumps)
+    app = make_app()
+    with app.app_context():
+        response = jsonify({"nombre": "José", "id": ObjectId("0123456789abcdef01234567")})
+
+    assert len(calls) == 1
+    assert response.get_data() == '{"id":"0123456789abcdef01234567","nombre":"José"}\n'.encode()
+
+def test_debug_indent_uses_orjson_indent(monkeypatch):
+    calls = []
+    real_dumps = orjson.dumps
+    monkeypatch.setattr(
+        json_provider.orjson, "dumps", lambda *a, **k: calls.append(k["option"]) or real_dumps(*a, **k)
+    )
+    app = make_app(debug=True)
+    with app.app_context():
+        body = jsonify({"b": 1, "a": [1]}).get_data(as_text=True)
+
+    assert calls and calls[0] & orjson.OPT_INDENT_2
+    assert body == '{\n  "a": [\n    1\n  ],\n  "b": 1\n}\n'
+
+def test_bson_and_standard_types():
+    app = make_app()
+    provider = app.json
+    data = {
+        "decimal": Decimal128("1.50"),
+        "py_decimal": decimal.Decimal("2.5"),
+        "fecha": datetime(2025, 10, 17, 12, 0, 0),
+    }
+    assert provider.loads(provider.dumps(data)) == {
+        "decimal": "1.50",
+        "py_decimal": "2.5",
+        "fecha": "Fri, 17 Oct 2025 12:00:00 GMT",
+    }
+
+def test_unknown_kwargs_fall_back_to_stdlib():
+    app = make_app()
+    assert app.json.dumps({"a": "é"}, ensure_ascii=True) == '{"a": "\\u00e9"}'
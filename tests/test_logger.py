@@ -0,0 +1,28 @@
+import logging.handlers
+import logger.logger as logger_module
+
+def test_per_worker_file_uses_gunicorn_slot(monkeypatch, tmp_path):
+    monkeypatch.setenv("LOG_PER_WORKER", "1")
+    monkeypatch.setenv("LOG_WORKER_SLOT", "2")
+    handler = logger_module._file_handler(str(tmp_path / "dash_api.log"))
+    try:
+        assert handler.baseFilename == str(tmp_path / "dash_api.2.log")
+        assert isinstance(handler, logging.handlers.RotatingFileHandler)
+    finally:
+        handler.close()
+
+def test_without_slot_uses_documented_path(monkeypatch, tmp_path):
+    monkeypatch.setenv("LOG_PER_WORKER", "1")
+    monkeypatch.delenv("LOG_WORKER_SLOT", raising=False)
+    handler = logger_module._file_handler(str(tmp_path / "dash_api.log"))
+    try:
+        assert handler.baseFilename == str(tmp_path / "dash_api.log")
+    finally:
+        handler.close()
+
+def test_summarize_truncates_payloads():
+    assert logger_module.summarize([1, 2, 3]) == "<list con 3 elementos>"
+    assert logger_module.summarize({"a": 1}) == "<dict con 1 llaves: a>"
+    assert logger_module.summarize("x" * (logger_module.MAX_MESSAGE_LENGTH + 5)).endswith(
+        f"({logger_module.MAX_MESSAGE_LENGTH + 5} caracteres)"
+    )
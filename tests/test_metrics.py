@@ -0,0 +1,62 @@
+import time
+from flask import Flask, Response, stream_with_context
+from prometheus_client import REGISTRY
+from metrics.metrics import current_route, init_metrics
+
+class Conn:
+    def add_event_listener(self, listener):
+        pass
+
+def make_app():
+    app = Flask(__name__)
+    init_metrics(app, Conn())
+    seen = {}
+
+    @app.route("/metrics-test/stream")
+    def stream():
+        def generate():
+            time.sleep(0.2)
+            seen["route"] = current_route.get()
+            yield "a"
+            yield "b"
+        return Response(stream_with_context(generate()))
+
+    @app.route("/metrics-test/plain")
+    def plain():
+        return "ok"
+
+    return app, seen
+
+def sample(name, route, **labels):
+    return REGISTRY.get_sample_value(name, {"route": route, **labels}) or 0
+
+def test_streamed_latency_covers_the_body():
+    app, seen = make_app()
+    route = "/metrics-test/stream"
+    before = sample("api_request_duration_seconds_sum", route, method="GET", status="200")
+
+    response = app.test_client().get(route)
+    assert response.get_data() == b"ab"
+    response.close()
+
+    elapsed = sample("api_request_duration_seconds_sum", route, method="GET", status="200") - before
+    assert elapsed >= 0.2
+    assert seen["route"] == route
+    assert sample("api_requests_in_flight", route) == 0
+    assert current_route.get() == "background"
+
+def test_in_flight_while_streaming():
+    app, _ = make_app()
+    route = "/metrics-test/stream"
+    response = app.test_client().get(route, buffered=False)
+    assert sample("api_requests_in_flight", route) == 1
+    response.close()
+    assert sample("api_requests_in_flight", route) == 0
+
+def test_plain_request_is_measured_in_teardown():
+    app, _ = make_app()
+    route = "/metrics-test/plain"
+    before = sample("api_request_duration_seconds_count", route, method="GET", status="200")
+    assert app.test_client().get(route).status_code == 200
+    assert sample("api_request_duration_seconds_count", route, method="GET", status="200") == before + 1
+    assert sample("api_requests_in_flight", route) == 0
@@ -0,0 +1,32 @@
+import pytest
+from models import model
+from models.model import BDModel
+
+@pytest.fixture
+def mongo_env(monkeypatch):
+    monkeypatch.setenv("MONGODB_HOST", "localhost")
+    monkeypatch.setenv("MONGODB_USER", "user")
+    monkeypatch.setenv("MONGODB_PASS", "pass")
+    return monkeypatch
+
+def test_pool_settings_are_read_from_the_environment(mongo_env):
+    mongo_env.setenv("MONGODB_MAX_POOL_SIZE", "20")
+    mongo_env.setenv("MONGODB_COMPRESSORS", "zstd,zlib")
+    db = BDModel()
+    db.connect_to_database()
+    stats = db.pool_stats()
+    assert stats["max_pool_size"] == 20
+    assert stats["compressors"] == "zstd,zlib"
+    assert stats["connected"] is False
+
+@pytest.mark.parametrize("compressors", ["lz4", "zstd,nada"])
+def test_unknown_compressor_is_rejected(mongo_env, compressors):
+    mongo_env.setenv("MONGODB_COMPRESSORS", compressors)
+    with pytest.raises(ValueError, match="MONGODB_COMPRESSORS"):
+        BDModel().connect_to_database()
+
+def test_missing_compressor_module_is_rejected(mongo_env):
+    mongo_env.setenv("MONGODB_COMPRESSORS", "snappy")
+    mongo_env.setitem(model.COMPRESSOR_MODULES, "snappy", "modulo_que_no_existe")
+    with pytest.raises(ValueError, match="snappy"):
+        BDModel().connect_to_database()
@@ -0,0 +1,71 @@
+from datetime import date, timedelta
+from services.rollup import ROLLUP_COLLECTION
+
+MONDAY = date(2025, 10, 6)
+
+def seed_daily(db_conn, counts, collection="rfcCounters"):
+    db_conn.db[collection].insert_many([{"_id": day, "seq": seq} for day, seq in counts.items()])
+
+def stored(db_conn):
+    return {record["_id"]: record["seq"] for record in db_conn.db[ROLLUP_COLLECTION].find()}
+
+def test_closed_weeks_are_materialized_and_then_read_back(service, db_conn):
+    seed_daily(db_conn, {"251006": 2, "251012": 3, "251013": 5})
+    totals = service.rollups.weekly_totals(["rfcCounters"], [MONDAY, MONDAY + timedelta(weeks=1)])
+    assert totals == {"rfcCounters": {MONDAY: 5, MONDAY + timedelta(weeks=1): 5}}
+    assert stored(db_conn) == {"rfcCounters:semana:251006": 5, "rfcCounters:semana:251013": 5}
+
+    # Los diarios ya no se leen para semanas materializadas
+    db_conn.db["rfcCounters"].update_one({"_id": "251006"}, {"$inc": {"seq": 100}})
+    assert service.rollups.weekly_totals(["rfcCounters"], [MONDAY])["rfcCounters"][MONDAY] == 5
+
+def test_current_week_is_summed_but_not_stored(service, db_conn):
+    today = date.today()
+    current = today - timedelta(days=today.weekday())
+    seed_daily(db_conn, {today.strftime("%y%m%d"): 4})
+    totals = service.rollups.weekly_totals(["rfcCounters"], [current])
+    assert totals["rfcCounters"][current] == 4
+    assert stored(db_conn) == {}
+
+def test_known_daily_avoids_reading_the_counters(service, db_conn, monkeypatch):
+    calls = []
+    monkeypatch.setattr(service.rollups, "fetch_daily_counts", lambda *args: calls.append(args) or {})
+    known = (MONDAY, MONDAY + timedelta(days=6), {"rfcCounters": {"251007": 7}})
+    totals = service.rollups.weekly_totals(["rfcCounters"], [MONDAY], known)
+    assert totals["rfcCounters"][MONDAY] == 7
+    assert calls == []
+
+def test_adjust_many_only_touches_materialized_periods(service, db_conn):
+    seed_daily(db_conn, {"251006": 2, "251007": 3})
+    service.rollups.rebuild(["rfcCounters"], date(2025, 10, 1), date(2025, 10, 31))
+    before = stored(db_conn)
+    assert before["rfcCounters:semana:251006"] == 5
+    assert before["rfcCounters:mes:251001"] == 5
+
+    service.rollups.adjust_many("rfcCounters", {"251006": -1, "251007": -1, "sin-fecha": -1})
+    after = stored(db_conn)
+    assert after["rfcCounters:semana:251006"] == 3
+    assert after["rfcCounters:mes:251001"] == 3
+
+def test_adjust_materializes_a_missing_closed_week_from_the_counters(service, db_conn):
+    seed_daily(db_conn, {"251006": 2, "251007": 3})
+    service.rollups.adjust_many("rfcCounters", {"251007": -1})
+    # El diario ya refleja el cambio: la semana se materializa con él
+    assert stored(db_conn) == {"rfcCounters:semana:251006": 5}
+
+def test_delete_during_materialization_is_not_lost(service, db_conn, monkeypatch):
+    seed_daily(db_conn, {"251006": 2, "251007": 3})
+    fetch = service.rollups.fetch_daily_counts
+
+    def stale_fetch(*args, **kwargs):
+        # weekly_totals ya leyó los diarios cuando llega un borrado
+        daily = fetch(*args, **kwargs)
+        db_conn.db["rfcCounters"].update_one({"_id": "251007"}, {"$inc": {"seq": -1}})
+        monkeypatch.setattr(service.rollups, "fetch_daily_counts", fetch)
+        service.rollups.adjust_many("rfcCounters", {"251007": -1})
+        return daily
+
+    monkeypatch.setattr(service.rollups, "fetch_daily_counts", stale_fetch)
+    totals = service.rollups.weekly_totals(["rfcCounters"], [MONDAY])
+    assert totals["rfcCounters"][MONDAY] == 5
+    assert stored(db_conn) == {"rfcCounters:semana:251006": 4}
@@ -0,0 +1,49 @@
+import random
+import pytest
+
+def seed_tel(db_conn, count=60):
+    rng = random.Random(7)
+    ids = rng.sample(range(10000), count)
+    db_conn.db["tel"].insert_many([
+        {"_id": f"251017{ids[n]:04d}", "nombreUsuario": f"Ana {n:03d}", "correoUsuario": f"ana{n}@x.mx", "nombreJefe": "Luis"}
+        for n in range(count)
+    ])
+
+def page_ids(service, offset, limit=20, texto="Ana"):
+    body, status = service.buscar_registros(texto, ["tel"], limit=limit, offset=offset)
+    assert status == 200
+    return [item["registro"]["_id"] for item in body["resultados"]], body["siguiente"]
+
+def test_paging_returns_every_match_once(service, db_conn):
+    seed_tel(db_conn)
+    seen, offset = [], 0
+    while offset is not None:
+        ids, offset = page_ids(service, offset)
+        seen += ids
+    assert len(seen) == 60
+    assert len(set(seen)) == 60
+
+@pytest.mark.parametrize("limit", [7, 20, 60])
+def test_pages_are_slices_of_the_full_ranking(service, db_conn, limit):
+    seed_tel(db_conn)
+    full, _ = page_ids(service, 0, limit=60)
+    for offset in range(0, 60, limit):
+        ids, _ = page_ids(service, offset, limit=min(limit, 60 - offset))
+        assert ids == full[offset:offset + limit]
+
+def test_exact_matches_rank_first_newest_first(service, db_conn):
+    db_conn.db["tel"].insert_many([
+        {"_id": "2510010001", "nombreUsuario": "Ana", "nombreJefe": "x"},
+        {"_id": "2510020001", "nombreUsuario": "Ana", "nombreJefe": "x"},
+        {"_id": "2510030001", "nombreUsuario": "Anabel", "nombreJefe": "x"},
+        {"_id": "2510040001", "nombreUsuario": "Zoe", "nombreJefe": "Ana"},
+    ])
+    ids, _ = page_ids(service, 0, limit=10)
+    assert ids == ["2510020001", "2510010001", "2510040001", "2510030001"]
+
+def test_search_indexes_match_the_query_order(service, db_conn):
+    db_conn.db["tel"].create_index([("nombreUsuario", 1)], name="busqueda_nombreUsuario")
+    service.asegurar_indices()
+    indexes = db_conn.db["tel"].index_information()
+    assert indexes["busqueda_nombreUsuario_id"]["key"] == [("nombreUsuario", 1), ("_id", -1)]
+    assert "busqueda_nombreUsuario" not in indexes